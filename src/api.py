@@ -1,13 +1,23 @@
 
 import uvicorn
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 from agent.main.main_agent import graph as main_graph
 from agent.main.main_state import MainInputState
 from langchain_core.messages import HumanMessage, AIMessage
+from tools.retriever_tool import start_retriever_warmup, retriever_status
 
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 포트 바인딩을 막지 않도록 retriever 로드/워밍업은 백그라운드 스레드에서 진행
+    start_retriever_warmup()
+    yield
+
+
+app = FastAPI(lifespan=lifespan)
 
 class ChatMessage(BaseModel):
     role: str
@@ -23,6 +33,12 @@ def convert_messages(messages):
         converted.append(HumanMessage(content=m.content))
     return converted
 
+@app.get("/ready")
+async def ready():
+    """모델과 인덱스가 로드되고 워밍업 질의까지 끝났을 때만 200"""
+    status = retriever_status()
+    return JSONResponse(status_code=200 if status["ready"] else 503, content=status)
+
 @app.post("/run")
 async def run_agent(req: ChatRequest):
     lc_messages = convert_messages(req.messages)
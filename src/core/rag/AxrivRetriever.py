@@ -1,167 +1,526 @@
 import os
 import json
-import re
-from typing import List, Tuple
+import asyncio
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Iterator, List, Tuple
+
+import numpy as np
 
 from langchain_core.documents import Document
-from langchain_huggingface import HuggingFaceEmbeddings
-from langchain_chroma import Chroma
+from langchain_core.embeddings import Embeddings
 
 
 from utils.helper import get_project_root
-from langchain_community.retrievers import BM25Retriever
+from core.rag.BM25Index import BM25Index, corpus_fingerprint
+from core.rag.DocStore import DocStore
+from core.rag.EmbeddingPipeline import EmbeddingPipeline
+from core.rag.EmbeddingBackend import create_embedding, resolve_embedding_config
+from core.rag.QueryEmbeddingCache import QueryEmbeddingCache
+from core.rag.QADeduplicator import QADeduplicator
+from core.rag.QALoader import iter_qa_records, parse_qa_pairs
+from core.rag.VectorBackend import ChromaBackend, FaissBackend
 
 
 class AxrivRetriever:
     FIXED_MODEL_NAME = "JINSUP/bge-m3-ko-axriv-agent-part-2025"  # 모델 고정
+    ENCODE_KWARGS = {"normalize_embeddings": True}
 
     def __init__(
         self,
         base_dir: str = str(get_project_root() / "src" / "data" / "agent"),
         collection_name: str = "qa_collection",
         persist_dir: str = str(get_project_root()/ ".chroma_db") ,
+        bm25_path: str | None = None,
+        bm25_tokenizer: str = "ko_en",
+        incremental: bool = False,
+        dedupe_threshold: float | None = 0.8,
+        load_workers: int = 1,
+        embed_batch_size: int = 64,
+        embed_workers: int = 1,
+        query_cache_bytes: int = 64 * 1024 * 1024,
+        search_workers: int = 4,
+        vector_backend: str = "chroma",
+        faiss_index_type: str = "flat",
+        faiss_kwargs: dict | None = None,
+        embedding: Embeddings | None = None,
+        query_cache: QueryEmbeddingCache | None = None,
+        embedding_backend: str | None = None,
+        onnx_dir: str | None = None,
+        onnx_variant: str | None = None,
     ):
         self.base_dir = base_dir
+        # 도메인 = 데이터 폴더 이름 (src/data/agent -> "agent")
+        self.domain = os.path.basename(os.path.normpath(base_dir))
         self.collection_name = collection_name
         self.persist_dir = persist_dir
-        self.embedding = HuggingFaceEmbeddings(
-            model_name=self.FIXED_MODEL_NAME,
-            encode_kwargs={"normalize_embeddings": True},
+        # 벡터 저장소 위치: chroma 는 persist_dir 그대로, faiss 는 persist_dir_faiss
+        if vector_backend == "chroma":
+            self.store_dir = persist_dir.rstrip(os.sep)
+        elif vector_backend == "faiss":
+            self.store_dir = f"{persist_dir.rstrip(os.sep)}_faiss"
+        else:
+            raise ValueError(f"지원하지 않는 vector_backend: {vector_backend}")
+        self.vector_backend = vector_backend
+        self.faiss_index_type = faiss_index_type
+        self.faiss_kwargs = faiss_kwargs or {}
+        # BM25 인덱스는 벡터 저장소 옆에 저장 (.chroma_db -> .chroma_db_bm25.pkl)
+        self.bm25_path = bm25_path or f"{self.store_dir}_bm25.pkl"
+        self.bm25_tokenizer = bm25_tokenizer
+        # 검색 결과 조립용 문서 저장소 (본문 버퍼 + 열 단위 메타데이터, 메모리 매핑)
+        self.docstore_path = f"{self.store_dir}_docstore"
+        # QA 쌍 content hash -> 문서 ID 매니페스트 (증분 인덱싱용)
+        self.manifest_path = f"{self.store_dir}_manifest.json"
+        self.incremental = incremental
+        # 근접 중복 QA 쌍 제거 (None 이면 완전히 같은 내용만 제거)
+        self.deduplicator = QADeduplicator(threshold=dedupe_threshold) if dedupe_threshold else None
+        # qa_dataset.jsonl 파싱 워커 프로세스 수 (1 이면 메인 프로세스에서 순차 파싱)
+        self.load_workers = load_workers
+        # 임베딩 런타임: torch(HuggingFaceEmbeddings) 또는 onnx (인자 / AXRIV_EMBEDDING_BACKEND)
+        self.embedding_config = resolve_embedding_config(
+            self.FIXED_MODEL_NAME, embedding_backend, onnx_dir, onnx_variant
+        )
+        # 샤드끼리 같은 모델을 공유할 수 있도록 외부에서 임베딩을 받을 수 있게 함
+        self.embedding = embedding or create_embedding(
+            self.FIXED_MODEL_NAME, self.ENCODE_KWARGS, **self.embedding_config
+        )
+        # 인덱스 빌드 시 배치 크기 / 임베딩 워커 프로세스 수
+        self.embed_batch_size = embed_batch_size
+        self.embed_workers = embed_workers
+        # 동일/유사 질의의 반복 임베딩 방지 (정규화된 질의 문자열 기준 LRU)
+        self.query_cache = query_cache or QueryEmbeddingCache(max_bytes=query_cache_bytes)
+        # dense / BM25 검색을 병렬로 돌리기 위한 스레드 풀 (임베딩은 이벤트 루프 밖에서 실행)
+        self._executor = ThreadPoolExecutor(
+            max_workers=search_workers, thread_name_prefix="axriv-search"
         )
 
         self.db = None
-        self.docs_cache = None
+        self.vector_store = None
+        self.docs = None
         self.bm25 = None
+        # 메타데이터 키 -> {값: 행 번호 배열} (필터 마스크용, 키별로 처음 쓸 때 생성)
+        self._meta_index = {}
+        # 인덱스가 다시 로드/빌드될 때마다 증가 (결과 캐시 무효화 기준)
+        self.index_version = 0
         self._init_vector_db()
 
+    def _create_vector_store(self):
+        if self.vector_backend == "faiss":
+            return FaissBackend(
+                store_dir=self.store_dir,
+                index_type=self.faiss_index_type,
+                **self.faiss_kwargs,
+            )
+        return ChromaBackend(
+            persist_dir=self.persist_dir,
+            collection_name=self.collection_name,
+            embedding=self.embedding,
+        )
+
+    def _open_vector_store(self):
+        self.vector_store = self._create_vector_store()
+        self.vector_store.open()
+        # Chroma 사용 시 기존처럼 langchain Chroma 객체에 직접 접근 가능
+        self.db = getattr(self.vector_store, "db", None)
+
     def _init_vector_db(self):
 
-        if os.path.exists(self.persist_dir):
+        if self._create_vector_store().exists():
             try:
-                self.db = Chroma(
-                    collection_name=self.collection_name,
-                    embedding_function=self.embedding,
-                    persist_directory=self.persist_dir,
-                )
-                
-                raw = self.db.get(include=["metadatas", "documents"])
-                docs = []
-                for content, meta in zip(raw["documents"], raw["metadatas"]):
-                    docs.append(Document(page_content=content, metadata=meta))
-
-                self.docs_cache = docs
+                self._open_vector_store()
+
+                # 증분 모드: 새로 추가/변경/삭제된 QA 쌍만 반영
+                if self.incremental:
+                    self.ingest()
+
                 if self.bm25 is None:
                     self._init_bm25()
 
-                print(" 기존 Chroma DB 로드 완료:", self.persist_dir)
+                print(f" 기존 {self.vector_backend} DB 로드 완료:", self.store_dir)
                 return
             except Exception as e:
                 print("기존 DB 불러오기 실패", e)
 
-        qa_pairs = self._load_qa_pairs()
-        docs = self._create_documents(qa_pairs)
-        self._build_vectorstore(docs)
-        self.docs_cache = docs
+        self._build_vectorstore()
         self._init_bm25()
 
     def _parse_qa_pairs(self, text: str) -> List[Tuple[str, str]]:
-        pattern = re.compile(r"Q(\d+):\s*(.+?)\nA\1:\s*(.+?)(?=(\nQ\d+:)|$)", re.DOTALL)
-        pairs = []
-        for m in pattern.finditer(text):
-            q = m.group(2).strip()
-            a = m.group(3).strip()
-            a = re.sub(r"출처:.*", "", a, flags=re.DOTALL).strip()
-            if q and a:
-                pairs.append((q, a))
-        return pairs
-
-    def _load_qa_pairs(self) -> List[Tuple[str, str]]:
-        pages_dirs = [
-            os.path.join(self.base_dir, d)
-            for d in os.listdir(self.base_dir)
-            if d.endswith("_pages") and os.path.isdir(os.path.join(self.base_dir, d))
-        ]
-        all_pairs = []
-
-        for folder in pages_dirs:
-            jsonl_path = os.path.join(folder, "qa_dataset.jsonl")
-            if not os.path.exists(jsonl_path):
-                continue
-
-            with open(jsonl_path, "r", encoding="utf-8") as f:
-                for line in f:
-                    if not line.strip():
-                        continue
-                    obj = json.loads(line)
-                    qa_text = obj.get("qa_pair", "")
-                    if not qa_text:
-                        continue
-                    pairs = self._parse_qa_pairs(qa_text)
-                    all_pairs.extend(pairs)
-        return all_pairs
-
-    def _create_documents(self, qa_pairs: List[Tuple[str, str]]) -> List[Document]:
-        docs = []
-        for q, a in qa_pairs:
+        return parse_qa_pairs(text)
+
+    def _iter_qa_pairs(self) -> Iterator[Tuple[str, str, str]]:
+        """(question, answer, pages 폴더명) 레코드를 폴더 단위로 스트리밍 (load_workers 개 프로세스에서 파싱)"""
+        return iter_qa_records(self.base_dir, workers=self.load_workers)
+
+    def _load_qa_pairs(self) -> List[Tuple[str, str, str]]:
+        """(question, answer, pages 폴더명) 목록"""
+        return list(self._iter_qa_pairs())
+
+    @staticmethod
+    def _content_hash(text: str) -> str:
+        return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+    def _paper_metadata(self, pages_dir: str) -> dict:
+        """pages 폴더명(agent_2408.07199v1_pages)에서 논문 단위 메타데이터를 만든다"""
+        paper_id = pages_dir[: -len("_pages")] if pages_dir.endswith("_pages") else pages_dir
+        if paper_id.startswith(f"{self.domain}_"):
+            paper_id = paper_id[len(self.domain) + 1 :]
+        return {
+            "source": "qa_dataset",
+            "domain": self.domain,
+            "paper_id": paper_id,
+            "pages_dir": pages_dir,
+        }
+
+    @staticmethod
+    def _metadata_sig(metadata: dict) -> str:
+        return hashlib.sha1(
+            json.dumps(metadata, sort_keys=True, ensure_ascii=False).encode("utf-8")
+        ).hexdigest()[:16]
+
+    def _iter_documents(self, qa_pairs: Iterable[Tuple[str, str, str]]) -> Iterator[Document]:
+        """
+        QA 레코드 → Document 스트림.
+        문서 ID = 내용 해시 → 동일한 QA 쌍은 한 번만, 근접 중복은 먼저 나온 대표 문서에 합쳐서 건너뜀.
+        병합 정보(merged_count / merged_sources / merged_ids)는 끝까지 읽은 뒤 deduplicator 에서 가져온다.
+        """
+        seen = set()
+        if self.deduplicator is not None:
+            self.deduplicator.reset()
+        for q, a, pages_dir in qa_pairs:
             combined = f"Question: {q}\nAnswer: {a}"
-            docs.append(
-                Document(page_content=combined, metadata={"source": "qa_dataset"})
+            doc_id = self._content_hash(combined)
+            if doc_id in seen:
+                continue
+            seen.add(doc_id)
+            doc = Document(
+                id=doc_id,
+                page_content=combined,
+                metadata=self._paper_metadata(pages_dir),
             )
+            if self.deduplicator is not None and not self.deduplicator.add(doc):
+                continue
+            yield doc
+
+    def _merged_metadata(self) -> dict:
+        if self.deduplicator is None:
+            return {}
+        self.deduplicator.report()
+        return self.deduplicator.merged_metadata()
+
+    def _create_documents(self, qa_pairs: Iterable[Tuple[str, str, str]]) -> List[Document]:
+        docs = list(self._iter_documents(qa_pairs))
+        merged = self._merged_metadata()
+        for doc in docs:
+            if doc.id in merged:
+                doc.metadata.update(merged[doc.id])
         return docs
 
-    def _build_vectorstore(self, docs: List[Document]):
-        self.db = Chroma.from_documents(
-            documents=docs,
+    def _build_vectorstore(self):
+        """
+        QA 레코드를 읽는 대로 임베딩 배치로 흘려보내며 새 저장소를 만든다.
+        전체 QA 목록을 메모리에 올리지 않고, 폴더 파싱과 임베딩이 겹쳐서 진행된다.
+        """
+        self._open_vector_store()
+        manifest, metadata_sigs, metadatas = {}, {}, {}
+
+        def sink(docs: List[Document], vectors: List[List[float]]):
+            self._write_batch(docs, vectors)
+            for d in docs:
+                manifest[d.id] = d.id
+                metadata_sigs[d.id] = self._metadata_sig(d.metadata)
+                metadatas[d.id] = d.metadata
+
+        self._embedding_pipeline().run_stream(
+            self._iter_documents(self._iter_qa_pairs()), sink=sink
+        )
+
+        # 이미 저장된 대표 문서에 근접 중복 병합 정보만 추가 (재임베딩 없음)
+        merged = self._merged_metadata()
+        if merged:
+            ids = list(merged)
+            new_metadatas = [{**metadatas[i], **merged[i]} for i in ids]
+            self.vector_store.update_metadata(ids, new_metadatas)
+            for doc_id, meta in zip(ids, new_metadatas):
+                metadata_sigs[doc_id] = self._metadata_sig(meta)
+
+        self.vector_store.persist()
+        self._save_manifest(manifest, metadata_sigs)
+        print("DB 생성 및 저장:", self.store_dir)
+
+    def _embedding_pipeline(self) -> EmbeddingPipeline:
+        return EmbeddingPipeline(
+            model_name=self.FIXED_MODEL_NAME,
+            encode_kwargs=self.ENCODE_KWARGS,
+            batch_size=self.embed_batch_size,
+            num_workers=self.embed_workers,
             embedding=self.embedding,
-            collection_name=self.collection_name,
-            persist_directory=self.persist_dir,
+            embedding_config=self.embedding_config,
+        )
+
+    def _write_batch(self, docs: List[Document], vectors: List[List[float]]):
+        # 미리 계산한 임베딩을 그대로 벡터 저장소에 업서트
+        self.vector_store.upsert(
+            ids=[d.id for d in docs],
+            vectors=vectors,
+            texts=[d.page_content for d in docs],
+            metadatas=[d.metadata for d in docs],
         )
-        print("DB 생성 및 저장:", self.persist_dir)
 
-    def _init_bm25(self):
-        self.bm25 = BM25Retriever.from_documents(self.docs_cache)
+    # ——— 증분 인덱싱 ———
+    def _load_manifest(self) -> Tuple[dict | None, dict]:
+        """(content hash -> 문서 ID, content hash -> 메타데이터 서명)"""
+        if not os.path.exists(self.manifest_path):
+            return None, {}
+        with open(self.manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        # version 1 매니페스트에는 메타데이터 서명이 없음 → 다음 ingest 에서 메타데이터만 갱신
+        return manifest.get("docs"), manifest.get("metadata", {})
+
+    def _save_manifest(self, docs: dict, metadata_sigs: dict):
+        tmp_path = f"{self.manifest_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": 2, "docs": docs, "metadata": metadata_sigs}, f)
+        os.replace(tmp_path, self.manifest_path)
+
+    def _rebuild_manifest(self) -> dict:
+        """매니페스트가 없는 기존 컬렉션: 저장된 문서 내용으로 해시를 다시 계산"""
+        ids, texts, _ = self.vector_store.get_all()
+        manifest = {}
+        duplicates = []
+        for doc_id, content in zip(ids, texts):
+            h = self._content_hash(content)
+            if h in manifest:
+                duplicates.append(doc_id)
+            else:
+                manifest[h] = doc_id
+        if duplicates:
+            self.vector_store.delete(duplicates)
+            self.vector_store.persist()
+        return manifest
+
+    def _upsert_documents(self, docs: List[Document]):
+        if docs:
+            self._embedding_pipeline().run(docs, sink=self._write_batch)
+            self.vector_store.persist()
+
+    def ingest(self) -> dict:
+        """
+        qa_dataset.jsonl 들을 다시 읽어 매니페스트와 비교하고,
+        새로 생겼거나 바뀐 QA 쌍만 임베딩/업서트, 사라진 QA 쌍은 삭제한다.
+        내용은 같고 메타데이터(논문/도메인)만 바뀐 문서는 재임베딩 없이 메타데이터만 갱신.
+        """
+        manifest, metadata_sigs = self._load_manifest()
+        if manifest is None:
+            manifest = self._rebuild_manifest()
+
+        docs = self._create_documents(self._iter_qa_pairs())
+        current = {d.id: d for d in docs}
+
+        added = [d for h, d in current.items() if h not in manifest]
+        removed = [h for h in manifest if h not in current]
+        relabeled = [
+            d
+            for h, d in current.items()
+            if h in manifest and metadata_sigs.get(h) != self._metadata_sig(d.metadata)
+        ]
+
+        if removed:
+            self.vector_store.delete([manifest[h] for h in removed])
+            for h in removed:
+                del manifest[h]
+                metadata_sigs.pop(h, None)
+        if relabeled:
+            self.vector_store.update_metadata(
+                [manifest[d.id] for d in relabeled], [d.metadata for d in relabeled]
+            )
+        if added:
+            self._upsert_documents(added)
+        elif removed or relabeled:
+            self.vector_store.persist()
+        for d in added + relabeled:
+            manifest.setdefault(d.id, d.id)
+            metadata_sigs[d.id] = self._metadata_sig(d.metadata)
+
+        self._save_manifest(manifest, metadata_sigs)
+        stats = {
+            "added": len(added),
+            "removed": len(removed),
+            "relabeled": len(relabeled),
+            "total": len(manifest),
+        }
+        print("증분 인덱싱 완료:", stats)
+
+        # 코퍼스가 바뀌었으면 BM25 도 다시 맞춘다 (지문 불일치 → 재생성).
+        # 메타데이터만 바뀐 경우는 ID 가 그대로라 지문이 같으므로 강제로 다시 빌드
+        if added or removed or relabeled:
+            self._init_bm25(force=bool(relabeled))
+        return stats
+
+    def _init_bm25(self, force: bool = False):
+        # 전체 문서 대신 ID 목록만 조회해서 지문 비교 → 일치하면 저장된 인덱스를 그대로 사용
+        ids = self.vector_store.get_ids()
+        fingerprint = corpus_fingerprint(ids)
+
+        index = docs = None
+        try:
+            index = BM25Index.load(self.bm25_path)
+            docs = DocStore.load(self.docstore_path)
+        except Exception as e:
+            print("BM25 인덱스 / 문서 저장소 로드 실패", e)
+
+        if (
+            force
+            or index is None
+            or docs is None
+            or index.fingerprint != fingerprint
+            or docs.fingerprint != fingerprint
+            or index.tokenizer != self.bm25_tokenizer
+        ):
+            # 두 파일의 행 순서가 같아야 하므로 항상 같은 get_all 결과로 함께 만든다
+            all_ids, texts, metadatas = self.vector_store.get_all()
+            index = BM25Index.build(all_ids, texts, tokenizer=self.bm25_tokenizer)
+            index.save(self.bm25_path)
+            docs = DocStore.build(self.docstore_path, all_ids, texts, metadatas)
+            del texts, metadatas
+            print("BM25 인덱스 / 문서 저장소 생성 및 저장:", self.bm25_path, self.docstore_path)
+        else:
+            print("BM25 인덱스 / 문서 저장소 로드 완료:", self.bm25_path, self.docstore_path)
+
+        self.bm25 = index
+        # 본문/메타데이터는 메모리 매핑된 DocStore 에만 두고, 최종 top-k 만 Document 로 만든다
+        self.docs = docs
+        self._meta_index = {}
+        self.index_version += 1
+
+    # ——— 메타데이터 필터 ———
+    def _rows_by_value(self, key: str) -> dict:
+        rows = self._meta_index.get(key)
+        if rows is None:
+            rows = self.docs.rows_by_value(key)
+            self._meta_index[key] = rows
+        return rows
+
+    def _filter_mask(self, filters: dict | None) -> np.ndarray | None:
+        """
+        {"paper_id": "2408.07199v1"} / {"domain": ["agent", "rag"]} 같은 동등 조건을
+        BM25 행 마스크로 변환. 여러 키는 AND, 리스트 값은 OR.
+        """
+        if not filters:
+            return None
+        mask = np.ones(len(self.bm25), dtype=bool)
+        for key, value in filters.items():
+            values = value if isinstance(value, (list, tuple, set)) else [value]
+            by_value = self._rows_by_value(key)
+            key_mask = np.zeros(len(self.bm25), dtype=bool)
+            for v in values:
+                if v in by_value:
+                    key_mask[by_value[v]] = True
+            mask &= key_mask
+        return mask
 
 
     default_w_dense = 0.4
     default_w_bm25 = 0.6
     default_k = 10
+    default_fusion = "weighted"
+    default_rrf_k = 60
+    # 서버/도구 워밍업에 쓰는 합성 질의 (한/영 토크나이저, 임베딩, 두 인덱스를 모두 태움)
+    warmup_query = "multi-agent memory architecture 에이전트 메모리 구조"
 
-    # 단순 가중치 앙상블 계산
+    # 단순 가중치 앙상블 계산 (dense 는 코사인 유사도, BM25 는 최댓값으로 정규화)
     def _weighted_fusion(
         self,
-        dense_results,
-        bm25_results,
+        dense_hits,
+        bm25_hits,
         k=default_k,
         w_dense=default_w_dense,
         w_bm25=default_w_bm25,
     ):
         score_dict = {}
 
-        # 의미 기반 검색 스코어 
-        for d in dense_results:
-            s = d.metadata.get("score", 1.0)
-            score_dict[d.page_content] = score_dict.get(d.page_content, 0) + w_dense * s
+        # 의미 기반 검색 스코어
+        for row, s in dense_hits:
+            score_dict[row] = score_dict.get(row, 0) + w_dense * s
 
         # 단어 기반 검색 스코어
-        max_bm25 = max((getattr(d, "score", 1.0) for d in bm25_results), default=1)
-        for d in bm25_results:
-            s = getattr(d, "score", 1.0) / max_bm25
-            score_dict[d.page_content] = score_dict.get(d.page_content, 0) + w_bm25 * s
+        max_bm25 = max((s for _, s in bm25_hits), default=1.0) or 1.0
+        for row, s in bm25_hits:
+            score_dict[row] = score_dict.get(row, 0) + w_bm25 * s / max_bm25
 
-        # 종합 
-        combined_docs = {d.page_content: d for d in (dense_results + bm25_results)}
-        ranked = sorted(score_dict.items(), key=lambda x: x[1], reverse=True)
+        return sorted(score_dict.items(), key=lambda x: x[1], reverse=True)[:k]
 
-        return [combined_docs[c] for c, _ in ranked[:k]]
+    # Reciprocal Rank Fusion: 점수 스케일과 무관하게 순위만으로 결합
+    def _rrf_fusion(
+        self,
+        dense_hits,
+        bm25_hits,
+        k=default_k,
+        w_dense=default_w_dense,
+        w_bm25=default_w_bm25,
+        rrf_k=default_rrf_k,
+    ):
+        score_dict = {}
+        for weight, hits in ((w_dense, dense_hits), (w_bm25, bm25_hits)):
+            for rank, (row, _) in enumerate(hits, start=1):
+                score_dict[row] = score_dict.get(row, 0) + weight / (rrf_k + rank)
+
+        return sorted(score_dict.items(), key=lambda x: x[1], reverse=True)[:k]
+
+    def _fuse(self, dense_hits, bm25_hits, k, w_dense, w_bm25, fusion, rrf_k):
+        if fusion == "rrf":
+            return self._rrf_fusion(dense_hits, bm25_hits, k, w_dense, w_bm25, rrf_k)
+        if fusion == "weighted":
+            return self._weighted_fusion(dense_hits, bm25_hits, k, w_dense, w_bm25)
+        raise ValueError(f"지원하지 않는 fusion 방식: {fusion}")
+
+    def _materialize(self, hits) -> List[Document]:
+        """(행 번호, 점수) 목록을 최종 Document 로 변환 (점수는 metadata["score"])"""
+        return [self.docs.document(row, score=float(score)) for row, score in hits]
+
+    def _embed_query(self, query: str):
+        return self.query_cache.get_or_compute(query, self.embedding.embed_query)
+
+    def _dense_hits_many(self, embeddings, k: int, **search_kwargs):
+        results = self.vector_store.search(np.stack(embeddings), k, **search_kwargs)
+        # 문서 ID -> 코퍼스 행 번호 (검색 결과 융합은 이 정수 행 번호 기준)
+        row_hits = []
+        for hits in results:
+            rows = self.docs.rows_of([doc_id for doc_id, _ in hits])
+            row_hits.append([(int(row), score) for row, (_, score) in zip(rows, hits) if row >= 0])
+        return row_hits
+
+    def _dense_hits(self, search_kwargs: dict, query: str):
+        search_kwargs = dict(search_kwargs)
+        k = search_kwargs.pop("k", self.default_k)
+        return self._dense_hits_many([self._embed_query(query)], k, **search_kwargs)[0]
+
+    def _bm25_hits(self, k, query: str, filters: dict | None = None):
+        return self.bm25.search_rows_many([query], k, self._filter_mask(filters))[0]
+
+    @staticmethod
+    def _dense_kwargs(k: int, filters: dict | None, dense_search_update_kwargs: dict) -> dict:
+        search_kwargs = {"k": k}
+        if filters:
+            # dense 쪽도 같은 조건으로 벡터 저장소에서 먼저 걸러낸 뒤 점수화
+            search_kwargs["filter"] = filters
+        search_kwargs.update(dense_search_update_kwargs)
+        return search_kwargs
 
     def dense_search(self, search_kwargs: dict, query: str):
-        dense_retriever = self.db.as_retriever(search_kwargs=search_kwargs)
-        return dense_retriever.invoke(query)
+        return self._materialize(self._dense_hits(search_kwargs, query))
+
+    def dense_search_many(self, queries: List[str], k: int = default_k, filter: dict | None = None):
+        """여러 질의를 한 번의 배치 임베딩 + 한 번의 벡터 검색 호출로 처리"""
+        embeddings = self.query_cache.get_or_compute_many(
+            queries, self.embedding.embed_documents
+        )
+        return [
+            self._materialize(hits)
+            for hits in self._dense_hits_many(embeddings, k, filter=filter)
+        ]
 
-    def bm25_search(self, k, query: str):
-        self.bm25.k = k
-        bm25_results = self.bm25.invoke(query)
-        return bm25_results
+    def bm25_search(self, k, query: str, filters: dict | None = None):
+        return self._materialize(self._bm25_hits(k, query, filters))
 
     def hybrid_search(
         self,
@@ -169,22 +528,111 @@ class AxrivRetriever:
         k: int = default_k,
         w_dense: float = default_w_dense,
         w_bm25: float = default_w_bm25,
+        fusion: str = default_fusion,
+        rrf_k: int = default_rrf_k,
+        filters: dict | None = None,
         **dense_search_update_kwargs
     ):
-        search_kwargs = {"k": k}
-        search_kwargs.update(dense_search_update_kwargs)
+        """
+        dense + BM25 하이브리드 검색.
+        filters(예: {"paper_id": "2408.07199v1"})를 주면 두 검색 모두 해당 문서만 대상으로 점수화.
+        """
+        search_kwargs = self._dense_kwargs(k, filters, dense_search_update_kwargs)
+
+        dense_hits = self._dense_hits(search_kwargs, query)
+        bm25_hits = self._bm25_hits(k, query, filters)
+        fused = self._fuse(dense_hits, bm25_hits, k, w_dense, w_bm25, fusion, rrf_k)
+
+        return self._materialize(fused)
+
+    def hybrid_search_concurrent(
+        self,
+        query: str,
+        k: int = default_k,
+        w_dense: float = default_w_dense,
+        w_bm25: float = default_w_bm25,
+        fusion: str = default_fusion,
+        rrf_k: int = default_rrf_k,
+        filters: dict | None = None,
+        **dense_search_update_kwargs
+    ):
+        """hybrid_search 와 동일하지만 dense / BM25 검색을 스레드 풀에서 동시에 실행"""
+        dense_hits, bm25_hits = self.hybrid_hits(query, k, filters, **dense_search_update_kwargs)
+        fused = self._fuse(dense_hits, bm25_hits, k, w_dense, w_bm25, fusion, rrf_k)
+        return self._materialize(fused)
+
+    def hybrid_hits(
+        self,
+        query: str,
+        k: int = default_k,
+        filters: dict | None = None,
+        **dense_search_update_kwargs
+    ):
+        """융합 전 (dense 히트, BM25 히트). 두 검색은 스레드 풀에서 동시에 실행"""
+        search_kwargs = self._dense_kwargs(k, filters, dense_search_update_kwargs)
+
+        dense_future = self._executor.submit(self._dense_hits, search_kwargs, query)
+        bm25_future = self._executor.submit(self._bm25_hits, k, query, filters)
+        return dense_future.result(), bm25_future.result()
 
-        dense_results = self.dense_search(search_kwargs, query)
-        bm25_results = self.bm25_search(k, query)
-        fused = self._weighted_fusion(
-            dense_results=dense_results,
-            bm25_results=bm25_results,
-            k=k,
-            w_dense=w_dense,
-            w_bm25=w_bm25,
+    async def ahybrid_search(
+        self,
+        query: str,
+        k: int = default_k,
+        w_dense: float = default_w_dense,
+        w_bm25: float = default_w_bm25,
+        fusion: str = default_fusion,
+        rrf_k: int = default_rrf_k,
+        filters: dict | None = None,
+        **dense_search_update_kwargs
+    ):
+        """hybrid_search 의 async 버전. 두 검색 모두 executor 에서 실행되어 이벤트 루프를 막지 않음"""
+        search_kwargs = self._dense_kwargs(k, filters, dense_search_update_kwargs)
+
+        loop = asyncio.get_running_loop()
+        dense_hits, bm25_hits = await asyncio.gather(
+            loop.run_in_executor(self._executor, self._dense_hits, search_kwargs, query),
+            loop.run_in_executor(self._executor, self._bm25_hits, k, query, filters),
         )
 
-        return fused
+        fused = self._fuse(dense_hits, bm25_hits, k, w_dense, w_bm25, fusion, rrf_k)
+        return self._materialize(fused)
+
+    def hybrid_search_many(
+        self,
+        queries: List[str],
+        k: int = default_k,
+        w_dense: float = default_w_dense,
+        w_bm25: float = default_w_bm25,
+        filters: dict | None = None,
+        fusion: str = default_fusion,
+        rrf_k: int = default_rrf_k,
+    ) -> List[List[Document]]:
+        """
+        여러 질의를 한 번에 검색. 질의 임베딩은 한 번의 배치 forward,
+        BM25 는 전체 질의를 한 번에 점수화하고, 질의별로 융합한 결과 리스트를 반환.
+        """
+        if not queries:
+            return []
+
+        dense_many, bm25_many = self.hybrid_hits_many(queries, k, filters)
+        return [
+            self._materialize(
+                self._fuse(dense_hits, bm25_hits, k, w_dense, w_bm25, fusion, rrf_k)
+            )
+            for dense_hits, bm25_hits in zip(dense_many, bm25_many)
+        ]
+
+    def hybrid_hits_many(self, queries: List[str], k: int = default_k, filters: dict | None = None):
+        """질의별 융합 전 (dense 히트 목록, BM25 히트 목록)"""
+        embeddings = self.query_cache.get_or_compute_many(
+            queries, self.embedding.embed_documents
+        )
+        dense_future = self._executor.submit(self._dense_hits_many, embeddings, k, filter=filters)
+        bm25_future = self._executor.submit(
+            self.bm25.search_rows_many, queries, k, self._filter_mask(filters)
+        )
+        return dense_future.result(), bm25_future.result()
 
 
 # 사용 예시
@@ -0,0 +1,259 @@
+import os
+import re
+import hashlib
+import pickle
+from typing import List, Optional
+
+import numpy as np
+from scipy import sparse
+
+
+def corpus_fingerprint(ids: List[str]) -> str:
+    """문서 ID 집합으로 코퍼스 지문(fingerprint)을 계산 (순서 무관)"""
+    h = hashlib.sha1()
+    h.update(str(len(ids)).encode("utf-8"))
+    for doc_id in sorted(ids):
+        h.update(b"\x00")
+        h.update(doc_id.encode("utf-8"))
+    return h.hexdigest()
+
+
+# ——— 토크나이저 ———
+_LATIN_OR_HANGUL = re.compile(r"[0-9a-z]+|[가-힣]+")
+
+
+def whitespace_tokenize(text: str) -> List[str]:
+    # BM25Retriever 기본 전처리와 동일 (공백 분리)
+    return text.split()
+
+
+def ko_en_tokenize(text: str) -> List[str]:
+    """
+    한/영 혼합 텍스트용 토크나이저.
+    영문/숫자는 소문자 단어 단위, 한글은 조사가 붙어도 매칭되도록 음절 bigram 으로 자른다.
+    """
+    tokens = []
+    for run in _LATIN_OR_HANGUL.findall(text.lower()):
+        if "가" <= run[0] <= "힣":
+            if len(run) == 1:
+                tokens.append(run)
+            else:
+                tokens.extend(run[i : i + 2] for i in range(len(run) - 1))
+        else:
+            tokens.append(run)
+    return tokens
+
+
+TOKENIZERS = {
+    "whitespace": whitespace_tokenize,
+    "ko_en": ko_en_tokenize,
+}
+
+
+class BM25Index:
+    """
+    디스크에 저장 가능한 BM25(Okapi) 인덱스.
+
+    rank_bm25.BM25Okapi 와 같은 점수식의 가중치를 미리 계산해서
+    (단어 수 x 문서 수) CSR 행렬로 들고 있는다. 질의 점수는 질의 단어 행만 읽는
+    희소 행렬 곱이므로 코퍼스 크기가 아니라 질의 단어의 posting 길이에 비례하고,
+    top-k 는 argpartition 으로 뽑는다.
+    재시작 시에는 행렬, 문서 길이, IDF, 코퍼스 지문을 한 파일에서 한 번에 읽는다.
+    문서 본문/메타데이터는 들고 있지 않으며, 행 번호는 DocStore 의 행 순서와 같다.
+    """
+
+    FORMAT_VERSION = 3
+
+    def __init__(
+        self,
+        k1: float = 1.5,
+        b: float = 0.75,
+        epsilon: float = 0.25,
+        tokenizer: str = "ko_en",
+    ):
+        if tokenizer not in TOKENIZERS:
+            raise ValueError(f"지원하지 않는 BM25 토크나이저: {tokenizer}")
+        self.k1 = k1
+        self.b = b
+        self.epsilon = epsilon
+        self.tokenizer = tokenizer
+
+        self.fingerprint = None
+
+        self.vocab = {}
+        # weights[term, doc] = idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * dl / avgdl))
+        self.weights = sparse.csr_matrix((0, 0), dtype=np.float32)
+        self.doc_len = np.zeros(0, dtype=np.float32)
+        self.idf = np.zeros(0, dtype=np.float32)
+        self.avgdl = 0.0
+
+    def params(self) -> dict:
+        return {"k1": self.k1, "b": self.b, "epsilon": self.epsilon, "tokenizer": self.tokenizer}
+
+    def tokenize(self, text: str) -> List[str]:
+        return TOKENIZERS[self.tokenizer](text)
+
+    def __len__(self):
+        return len(self.doc_len)
+
+    @classmethod
+    def build(
+        cls,
+        ids: List[str],
+        texts: List[str],
+        **params,
+    ) -> "BM25Index":
+        index = cls(**params)
+        index.fingerprint = corpus_fingerprint(list(ids))
+
+        vocab = {}
+        rows, cols, tfs = [], [], []
+        doc_len = np.zeros(len(texts), dtype=np.float32)
+        for doc_idx, text in enumerate(texts):
+            tokens = index.tokenize(text)
+            doc_len[doc_idx] = len(tokens)
+            tf = {}
+            for t in tokens:
+                tf[t] = tf.get(t, 0) + 1
+            for t, c in tf.items():
+                rows.append(vocab.setdefault(t, len(vocab)))
+                cols.append(doc_idx)
+                tfs.append(c)
+
+        n_docs = len(texts)
+        n_terms = len(vocab)
+        tf_matrix = sparse.csr_matrix(
+            (np.asarray(tfs, dtype=np.float32), (np.asarray(rows), np.asarray(cols))),
+            shape=(n_terms, n_docs),
+        )
+
+        # rank_bm25 와 동일: 음수 IDF 는 epsilon * 평균 IDF 로 대체
+        df = np.diff(tf_matrix.indptr).astype(np.float64)
+        idf = np.log(n_docs - df + 0.5) - np.log(df + 0.5)
+        if len(idf):
+            idf[idf < 0] = index.epsilon * idf.mean()
+
+        avgdl = float(doc_len.mean()) if n_docs else 0.0
+        norm = index.k1 * (1 - index.b + index.b * doc_len / max(avgdl, 1e-9))
+
+        weights = tf_matrix.copy()
+        tf = weights.data
+        term_of_entry = np.repeat(np.arange(n_terms), np.diff(weights.indptr))
+        weights.data = (
+            idf[term_of_entry] * (tf * (index.k1 + 1)) / (tf + norm[weights.indices])
+        ).astype(np.float32)
+
+        index.vocab = vocab
+        index.weights = weights
+        index.doc_len = doc_len
+        index.idf = idf.astype(np.float32)
+        index.avgdl = avgdl
+        return index
+
+    def _query_matrix(self, queries: List[str]) -> sparse.csr_matrix:
+        """질의별 단어 빈도 (질의 수 x 단어 수). 반복된 질의 단어는 rank_bm25 처럼 중복 합산"""
+        rows, cols = [], []
+        for qi, query in enumerate(queries):
+            for t in self.tokenize(query):
+                term_idx = self.vocab.get(t)
+                if term_idx is not None:
+                    rows.append(qi)
+                    cols.append(term_idx)
+        return sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.float32), (rows, cols)),
+            shape=(len(queries), len(self.vocab)),
+        )
+
+    def _score_matrix(self, queries: List[str]) -> sparse.csr_matrix:
+        # 질의 단어 행만 곱해지므로 비용은 해당 postings 크기에 비례
+        return (self._query_matrix(queries) @ self.weights).tocsr()
+
+    def get_scores(self, query: str) -> np.ndarray:
+        return self.get_scores_many([query])[0]
+
+    def get_scores_many(self, queries: List[str]) -> np.ndarray:
+        """여러 질의의 점수를 (질의 수, 문서 수) dense 행렬로 반환 (분석/디버깅용)"""
+        if not queries:
+            return np.zeros((0, len(self)), dtype=np.float32)
+        return self._score_matrix(queries).toarray().astype(np.float32)
+
+    @staticmethod
+    def _top_k(doc_idx: np.ndarray, scores: np.ndarray, k: int):
+        if len(scores) > k:
+            part = np.argpartition(-scores, k - 1)[:k]
+            doc_idx, scores = doc_idx[part], scores[part]
+        order = np.argsort(-scores, kind="stable")
+        return doc_idx[order], scores[order]
+
+    def search_rows_many(
+        self, queries: List[str], k: int, mask: np.ndarray | None = None
+    ) -> List[List[tuple]]:
+        """
+        질의 전체를 한 번의 희소 행렬 곱으로 점수화.
+        질의별로 매칭된 문서 중 상위 k 개의 (행 번호, 점수) 목록을 반환.
+        mask(문서 수 길이의 bool 배열)를 주면 허용된 문서만 top-k 후보로 삼는다.
+        """
+        if not queries:
+            return []
+        if mask is not None and not mask.any():
+            return [[] for _ in queries]
+        scores = self._score_matrix(queries)
+        results = []
+        for qi in range(len(queries)):
+            start, end = scores.indptr[qi], scores.indptr[qi + 1]
+            doc_idx, row_scores = scores.indices[start:end], scores.data[start:end]
+            if mask is not None:
+                keep = mask[doc_idx]
+                doc_idx, row_scores = doc_idx[keep], row_scores[keep]
+            doc_idx, row_scores = self._top_k(doc_idx, row_scores, k)
+            results.append([(int(i), float(s)) for i, s in zip(doc_idx, row_scores)])
+        return results
+
+    # ——— 저장 / 로드 ———
+    def save(self, path: str):
+        state = {
+            "version": self.FORMAT_VERSION,
+            "params": self.params(),
+            "fingerprint": self.fingerprint,
+            "vocab": self.vocab,
+            "weights_shape": self.weights.shape,
+            "weights_data": self.weights.data,
+            "weights_indices": self.weights.indices,
+            "weights_indptr": self.weights.indptr,
+            "doc_len": self.doc_len,
+            "idf": self.idf,
+            "avgdl": self.avgdl,
+        }
+        # 저장 도중 중단되어도 기존 인덱스가 깨지지 않도록 임시 파일에 쓰고 교체
+        # (프로세스별 임시 이름이라 동시에 저장해도 서로의 임시 파일을 덮어쓰지 않음)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    @classmethod
+    def load(cls, path: str) -> Optional["BM25Index"]:
+        """저장된 인덱스를 로드. 파일이 없거나 포맷 버전이 다르면 None"""
+        if not os.path.exists(path):
+            return None
+        with open(path, "rb") as f:
+            state = pickle.load(f)
+        if state.get("version") != cls.FORMAT_VERSION:
+            return None
+
+        index = cls(**state["params"])
+        index.fingerprint = state["fingerprint"]
+        index.vocab = state["vocab"]
+        index.weights = sparse.csr_matrix(
+            (state["weights_data"], state["weights_indices"], state["weights_indptr"]),
+            shape=state["weights_shape"],
+        )
+        index.doc_len = state["doc_len"]
+        index.idf = state["idf"]
+        index.avgdl = state["avgdl"]
+        return index
@@ -0,0 +1,170 @@
+import re
+import threading
+from typing import List, Tuple
+
+from langchain_core.documents import Document
+
+from core.rag.BM25Index import ko_en_tokenize
+
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?。])\s+|\n+")
+_QA_PATTERN = re.compile(r"^Question:\s*(.*?)\nAnswer:\s*(.*)$", re.DOTALL)
+_HANGUL = re.compile(r"[\uac00-\ud7a3\u3131-\u318e]")
+_NOT_LOADED = object()
+
+
+def _load_encoding(name: str):
+    try:
+        import tiktoken
+
+        return tiktoken.get_encoding(name)
+    except Exception as e:
+        # 오프라인 환경 등에서 BPE 파일을 받지 못하면 근사치(문자 수 기반)로 계산
+        print(f"tiktoken 인코딩 로드 실패 ({name}), 토큰 수를 근사치로 계산", e)
+        return None
+
+
+def _estimate_tokens(text: str) -> int:
+    """tiktoken 없이 세는 근사치: 한글은 음절당 약 1 토큰, 나머지는 약 3 글자당 1 토큰"""
+    if not text:
+        return 0
+    hangul = len(_HANGUL.findall(text))
+    return max(1, hangul + (len(text) - hangul) // 3)
+
+
+class ContextPacker:
+    """
+    검색 결과를 토큰 예산 안에 맞춰 LLM 에 넘길 텍스트로 묶는다.
+
+    - 앞에 이미 담긴 답변과 거의 같은 답변(토큰 Jaccard >= redundancy_threshold)은 제외
+    - 답변은 질의와 많이 겹치는 문장만 최대 max_sentences 개 남김 (원래 순서 유지)
+    - 누적 토큰이 max_tokens 를 넘으면 거기서 멈춤
+    토큰 수는 tiktoken(o200k_base) 기준이며, 호출마다 원문 대비 절약량을 기록한다.
+    인코딩은 생성 시점이 아니라 처음 토큰을 셀 때(또는 warm_up()) 로드한다.
+    """
+
+    SEPARATOR = "\n\n---\n\n"
+
+    def __init__(
+        self,
+        max_tokens: int = 2000,
+        max_sentences: int = 3,
+        redundancy_threshold: float = 0.8,
+        encoding: str = "o200k_base",
+    ):
+        self.max_tokens = max_tokens
+        self.max_sentences = max_sentences
+        self.redundancy_threshold = redundancy_threshold
+        self.encoding_name = encoding
+        self._encoding = _NOT_LOADED
+        self._lock = threading.Lock()
+        self._encoding_lock = threading.Lock()
+
+        self.calls = 0
+        self.raw_tokens = 0
+        self.packed_tokens = 0
+
+    def _get_encoding(self):
+        if self._encoding is _NOT_LOADED:
+            with self._encoding_lock:
+                if self._encoding is _NOT_LOADED:
+                    self._encoding = _load_encoding(self.encoding_name)
+        return self._encoding
+
+    def warm_up(self) -> None:
+        """BPE 파일 로드(최초 1회 다운로드 포함)를 첫 요청 전에 미리 수행"""
+        self._get_encoding()
+
+    def count_tokens(self, text: str) -> int:
+        encoding = self._get_encoding()
+        if encoding is None:
+            return _estimate_tokens(text)
+        return len(encoding.encode(text, disallowed_special=()))
+
+    @staticmethod
+    def _split(doc: Document) -> Tuple[str, List[str]]:
+        """page_content → (질문 줄, 답변 문장 목록). QA 형식이 아니면 전체를 문장으로 취급"""
+        m = _QA_PATTERN.match(doc.page_content)
+        if not m:
+            return "", [s.strip() for s in _SENTENCE_SPLIT.split(doc.page_content) if s.strip()]
+        question, answer = m.group(1).strip(), m.group(2)
+        return f"Question: {question}", [s.strip() for s in _SENTENCE_SPLIT.split(answer) if s.strip()]
+
+    def _top_sentences(self, query_tokens: set, sentences: List[str]) -> List[str]:
+        if len(sentences) <= self.max_sentences:
+            return sentences
+        scores = [len(query_tokens & set(ko_en_tokenize(s))) for s in sentences]
+        # 점수가 같으면 앞 문장 우선
+        ranked = sorted(range(len(sentences)), key=lambda i: (-scores[i], i))
+        keep = sorted(ranked[: self.max_sentences])
+        return [sentences[i] for i in keep]
+
+    @staticmethod
+    def _render(question: str, sentences: List[str]) -> str:
+        answer = " ".join(sentences)
+        return f"{question}\nAnswer: {answer}" if question else answer
+
+    def _is_redundant(self, tokens: set, packed: List[set]) -> bool:
+        for other in packed:
+            union = len(tokens | other)
+            if union and len(tokens & other) / union >= self.redundancy_threshold:
+                return True
+        return False
+
+    def pack(self, query: str, docs: List[Document]) -> Tuple[str, dict]:
+        query_tokens = set(ko_en_tokenize(query))
+        sep_tokens = self.count_tokens(self.SEPARATOR)
+
+        parts = []
+        packed_answers: List[set] = []
+        used = 0
+        redundant = 0
+        for doc in docs:
+            question, sentences = self._split(doc)
+            answer_tokens = set(ko_en_tokenize(" ".join(sentences)))
+            if self._is_redundant(answer_tokens, packed_answers):
+                redundant += 1
+                continue
+
+            sentences = self._top_sentences(query_tokens, sentences)
+            cost = sep_tokens if parts else 0
+            # 예산이 모자라면 문장을 하나씩 줄여서라도 넣어 보고, 한 문장도 안 되면 종료
+            while sentences:
+                text = self._render(question, sentences)
+                tokens = self.count_tokens(text)
+                if used + cost + tokens <= self.max_tokens:
+                    break
+                sentences = sentences[:-1]
+            if not sentences:
+                break
+
+            parts.append(text)
+            packed_answers.append(answer_tokens)
+            used += cost + tokens
+
+        packed = self.SEPARATOR.join(parts)
+        raw_tokens = self.count_tokens(self.SEPARATOR.join(d.page_content for d in docs))
+        packed_tokens = self.count_tokens(packed)
+        stats = {
+            "docs": len(docs),
+            "packed_docs": len(parts),
+            "redundant_docs": redundant,
+            "raw_tokens": raw_tokens,
+            "packed_tokens": packed_tokens,
+            "saved_tokens": max(0, raw_tokens - packed_tokens),
+        }
+        with self._lock:
+            self.calls += 1
+            self.raw_tokens += raw_tokens
+            self.packed_tokens += packed_tokens
+        return packed, stats
+
+    def stats(self) -> dict:
+        with self._lock:
+            saved = max(0, self.raw_tokens - self.packed_tokens)
+            return {
+                "calls": self.calls,
+                "raw_tokens": self.raw_tokens,
+                "packed_tokens": self.packed_tokens,
+                "saved_tokens": saved,
+                "saved_ratio": round(saved / self.raw_tokens, 4) if self.raw_tokens else 0.0,
+            }
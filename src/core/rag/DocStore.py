@@ -0,0 +1,219 @@
+import os
+import json
+import mmap
+import uuid
+import shutil
+from typing import List, Optional
+
+import numpy as np
+from langchain_core.documents import Document
+
+from core.rag.BM25Index import corpus_fingerprint
+
+
+def _swap_dir(tmp_path: str, path: str):
+    """
+    완성된 tmp_path 를 path 로 교체.
+    기존 디렉터리를 먼저 지우지 않고 옆으로 옮긴 뒤 교체하므로, path 가 비어 있는 순간이
+    rename 두 번 사이로 짧고 교체가 실패하면 기존 디렉터리를 되돌린다.
+    이미 열려 있는 매핑은 기존 파일을 계속 가리키므로 옛 디렉터리를 지워도 안전하다.
+    """
+    old_path = None
+    if os.path.exists(path):
+        old_path = f"{path}.{os.getpid()}.{uuid.uuid4().hex[:8]}.old"
+        os.replace(path, old_path)
+    try:
+        os.replace(tmp_path, path)
+    except BaseException:
+        if old_path:
+            os.replace(old_path, path)
+        raise
+    if old_path:
+        shutil.rmtree(old_path, ignore_errors=True)
+
+
+class DocStore:
+    """
+    검색 결과 조립용 읽기 전용 문서 저장소 (디렉터리 하나, 메모리 매핑).
+
+    - text.bin     : 전체 page_content 를 이어 붙인 UTF-8 버퍼
+    - offsets.npy  : 행별 시작 위치 (문서 수 + 1, int64)
+    - ids.npy      : 문서 ID (고정 폭 bytes), id_sorted.npy / id_order.npy 로 이진 탐색
+    - meta_<i>.npy : 메타데이터 키별 값 코드 (int32, 없으면 -1), 값 사전은 store.json
+    Document 는 최종 top-k 를 돌려줄 때만 행 단위로 만든다.
+    행 순서는 BM25Index 의 문서 순서와 같다.
+    """
+
+    FORMAT_VERSION = 1
+
+    def __init__(self, path: str):
+        self.path = path
+        self.fingerprint = None
+        self.keys: List[str] = []
+        self._values: List[list] = []
+        self._codes: List[np.ndarray] = []
+        self._text = b""
+        self._offsets = np.zeros(1, dtype=np.int64)
+        self._ids = np.zeros(0, dtype="S1")
+        self._id_order = np.zeros(0, dtype=np.int64)
+        self._id_sorted = np.zeros(0, dtype="S1")
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    # ——— 생성 / 로드 ———
+    @classmethod
+    def build(
+        cls, path: str, ids: List[str], texts: List[str], metadatas: List[dict]
+    ) -> "DocStore":
+        # 여러 프로세스가 동시에 빌드해도 서로의 임시 디렉터리를 지우지 않도록 고유 이름 사용
+        tmp_path = f"{path}.{os.getpid()}.{uuid.uuid4().hex[:8]}.tmp"
+        os.makedirs(tmp_path)
+        try:
+            cls._write(tmp_path, ids, texts, metadatas)
+            _swap_dir(tmp_path, path)
+        except BaseException:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            raise
+        return cls.load(path)
+
+    @classmethod
+    def _write(cls, tmp_path: str, ids: List[str], texts: List[str], metadatas: List[dict]):
+        offsets = np.zeros(len(texts) + 1, dtype=np.int64)
+        with open(os.path.join(tmp_path, "text.bin"), "wb") as f:
+            for row, text in enumerate(texts):
+                data = (text or "").encode("utf-8")
+                f.write(data)
+                offsets[row + 1] = offsets[row] + len(data)
+        np.save(os.path.join(tmp_path, "offsets.npy"), offsets)
+
+        id_bytes = np.asarray([doc_id.encode("utf-8") for doc_id in ids], dtype=bytes)
+        if not len(id_bytes):
+            id_bytes = np.zeros(0, dtype="S1")
+        np.save(os.path.join(tmp_path, "ids.npy"), id_bytes)
+        id_order = np.argsort(id_bytes, kind="stable")
+        np.save(os.path.join(tmp_path, "id_order.npy"), id_order)
+        np.save(os.path.join(tmp_path, "id_sorted.npy"), id_bytes[id_order])
+
+        # 메타데이터는 키별 열(column)로: 값 사전 + 행별 코드
+        keys, values, lookups = [], [], []
+        codes = []
+        for row, meta in enumerate(metadatas):
+            for key, value in (meta or {}).items():
+                if key not in keys:
+                    keys.append(key)
+                    values.append([])
+                    lookups.append({})
+                    codes.append(np.full(len(metadatas), -1, dtype=np.int32))
+                col = keys.index(key)
+                lookup = lookups[col]
+                # True 와 1 이 같은 키로 합쳐지지 않도록 타입까지 구분
+                token = (type(value).__name__, value)
+                if token not in lookup:
+                    lookup[token] = len(values[col])
+                    values[col].append(value)
+                codes[col][row] = lookup[token]
+        for col, column in enumerate(codes):
+            np.save(os.path.join(tmp_path, f"meta_{col}.npy"), column)
+
+        state = {
+            "version": cls.FORMAT_VERSION,
+            "fingerprint": corpus_fingerprint(list(ids)),
+            "keys": keys,
+            "values": values,
+        }
+        with open(os.path.join(tmp_path, "store.json"), "w", encoding="utf-8") as f:
+            json.dump(state, f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, path: str) -> Optional["DocStore"]:
+        """저장된 문서 저장소를 메모리 매핑으로 연다. 없거나 포맷 버전이 다르면 None"""
+        state_path = os.path.join(path, "store.json")
+        if not os.path.exists(state_path):
+            return None
+        with open(state_path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+        if state.get("version") != cls.FORMAT_VERSION:
+            return None
+
+        store = cls(path)
+        store.fingerprint = state["fingerprint"]
+        store.keys = state["keys"]
+        store._values = state["values"]
+
+        def _load(name):
+            return np.load(os.path.join(path, name), mmap_mode="r")
+
+        store._offsets = _load("offsets.npy")
+        store._ids = _load("ids.npy")
+        store._id_order = _load("id_order.npy")
+        store._id_sorted = _load("id_sorted.npy")
+        store._codes = [_load(f"meta_{col}.npy") for col in range(len(store.keys))]
+
+        if store._offsets[-1]:
+            with open(os.path.join(path, "text.bin"), "rb") as f:
+                store._text = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return store
+
+    # ——— 행 단위 접근 ———
+    def id(self, row: int) -> str:
+        return self._ids[row].decode("utf-8")
+
+    @property
+    def ids(self) -> List[str]:
+        return [doc_id.decode("utf-8") for doc_id in self._ids]
+
+    def text(self, row: int) -> str:
+        start, end = self._offsets[row], self._offsets[row + 1]
+        return self._text[start:end].decode("utf-8")
+
+    def metadata(self, row: int) -> dict:
+        meta = {}
+        for key, values, codes in zip(self.keys, self._values, self._codes):
+            code = codes[row]
+            if code >= 0:
+                meta[key] = values[code]
+        return meta
+
+    def document(self, row: int, **extra_metadata) -> Document:
+        return Document(
+            id=self.id(row),
+            page_content=self.text(row),
+            metadata={**self.metadata(row), **extra_metadata},
+        )
+
+    def rows_of(self, ids: List[str]) -> np.ndarray:
+        """문서 ID 목록 → 행 번호 배열 (없는 ID 는 -1)"""
+        if not len(self._ids) or not ids:
+            return np.full(len(ids), -1, dtype=np.int64)
+        keys = np.asarray([doc_id.encode("utf-8") for doc_id in ids], dtype=self._ids.dtype)
+        sorted_ids = self._id_sorted
+        pos = np.searchsorted(sorted_ids, keys).clip(max=len(sorted_ids) - 1)
+        # 고정 폭보다 긴 ID 는 잘려서 비교되므로 원래 바이트 길이로 한 번 더 확인
+        found = (sorted_ids[pos] == keys) & np.asarray(
+            [len(doc_id.encode("utf-8")) <= self._ids.dtype.itemsize for doc_id in ids]
+        )
+        return np.where(found, self._id_order[pos], -1)
+
+    def rows_by_value(self, key: str) -> dict:
+        """메타데이터 key 의 값별 행 번호 배열 (필터 마스크용)"""
+        if key not in self.keys:
+            return {}
+        col = self.keys.index(key)
+        codes = np.asarray(self._codes[col])
+        order = np.argsort(codes, kind="stable")
+        bounds = np.searchsorted(codes[order], np.arange(len(self._values[col]) + 1))
+        return {
+            value: order[bounds[code] : bounds[code + 1]].astype(np.int64)
+            for code, value in enumerate(self._values[col])
+        }
+
+    def nbytes(self) -> int:
+        return int(
+            len(self._text)
+            + self._offsets.nbytes
+            + self._ids.nbytes
+            + self._id_order.nbytes
+            + self._id_sorted.nbytes
+            + sum(c.nbytes for c in self._codes)
+        )
@@ -0,0 +1,401 @@
+"""
+임베딩 런타임 선택 (PyTorch / ONNX Runtime).
+
+- torch: 기존처럼 HuggingFaceEmbeddings(sentence-transformers) 사용
+- onnx : export 명령으로 만든 ONNX 모델(fp32 또는 동적 int8 양자화)을 CPU 에서 실행
+
+pooling / max_length 는 모델의 sentence-transformers 설정을 따른다 (torch 경로와 같은 결과).
+
+ONNX 모델 만들기 / PyTorch 출력과 코사인 일치도 확인 (src 디렉터리에서):
+    python -m core.rag.EmbeddingBackend export --model JINSUP/bge-m3-ko-axriv-agent-part-2025
+    python -m core.rag.EmbeddingBackend parity --model JINSUP/bge-m3-ko-axriv-agent-part-2025
+"""
+import os
+import json
+import time
+import argparse
+from typing import List
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from utils.helper import get_project_root
+
+EMBEDDING_BACKENDS = ("torch", "onnx")
+ONNX_VARIANTS = {"fp32": "model.onnx", "int8": "model_int8.onnx"}
+CONFIG_FILE = "embedding_config.json"
+
+PARITY_TEXTS = [
+    "멀티 에이전트 시스템에서 메모리 구조는 어떻게 설계되나요?",
+    "What is retrieval-augmented generation and why does it reduce hallucination?",
+    "Question: 에이전트의 계획(planning) 단계는 무엇인가요?\nAnswer: 목표를 하위 작업으로 분해하고 순서를 정하는 단계입니다.",
+    "Reflection lets an LLM agent critique its own trajectory and retry with feedback.",
+    "도구 호출(tool calling) 실패 시 재시도 정책",
+    "A short one.",
+    # 512 토큰을 넘는 긴 문서: ONNX 의 max_length 가 torch(sentence-transformers)와 다르면 여기서 드러남
+    "Question: 에이전트의 장기 메모리는 어떻게 관리되나요?\nAnswer: "
+    + " ".join(["에이전트는 관찰, 계획, 도구 호출, 반성 단계를 반복하며 중요한 경험을 장기 메모리에 저장합니다."] * 60),
+    " ".join(
+        ["Retrieval-augmented generation retrieves supporting passages before decoding, "
+         "which grounds the answer in the source papers and reduces hallucination."] * 50
+    ),
+]
+
+
+def default_onnx_dir(model_name: str) -> str:
+    return str(get_project_root() / ".onnx" / model_name.replace("/", "__"))
+
+
+def resolve_embedding_config(
+    model_name: str,
+    backend: str | None = None,
+    onnx_dir: str | None = None,
+    onnx_variant: str | None = None,
+) -> dict:
+    """인자 > 환경 변수(AXRIV_EMBEDDING_BACKEND / AXRIV_ONNX_DIR / AXRIV_ONNX_VARIANT) > 기본값"""
+    backend = backend or os.environ.get("AXRIV_EMBEDDING_BACKEND", "torch")
+    if backend not in EMBEDDING_BACKENDS:
+        raise ValueError(f"지원하지 않는 임베딩 백엔드: {backend}")
+    config = {"backend": backend}
+    if backend == "onnx":
+        config["onnx_dir"] = (
+            onnx_dir or os.environ.get("AXRIV_ONNX_DIR") or default_onnx_dir(model_name)
+        )
+        config["onnx_variant"] = onnx_variant or os.environ.get("AXRIV_ONNX_VARIANT", "int8")
+        if config["onnx_variant"] not in ONNX_VARIANTS:
+            raise ValueError(f"지원하지 않는 ONNX 모델 종류: {config['onnx_variant']}")
+    return config
+
+
+def create_embedding(
+    model_name: str,
+    encode_kwargs: dict | None = None,
+    backend: str = "torch",
+    onnx_dir: str | None = None,
+    onnx_variant: str = "int8",
+    num_threads: int | None = None,
+) -> Embeddings:
+    if backend == "onnx":
+        return OnnxEmbeddings(
+            onnx_dir or default_onnx_dir(model_name),
+            variant=onnx_variant,
+            normalize=(encode_kwargs or {}).get("normalize_embeddings", True),
+            num_threads=num_threads,
+        )
+    if backend == "torch":
+        from langchain_huggingface import HuggingFaceEmbeddings
+
+        return HuggingFaceEmbeddings(model_name=model_name, encode_kwargs=encode_kwargs or {})
+    raise ValueError(f"지원하지 않는 임베딩 백엔드: {backend}")
+
+
+def _load_model_file(model_name: str, filename: str) -> dict | None:
+    """로컬 디렉터리 또는 HF Hub 모델의 JSON 설정 파일 (없으면 None)"""
+    if os.path.isdir(model_name):
+        path = os.path.join(model_name, filename)
+        if not os.path.exists(path):
+            return None
+    else:
+        from huggingface_hub import hf_hub_download
+
+        try:
+            path = hf_hub_download(model_name, filename)
+        except Exception:
+            return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _model_length_limit(model_name: str) -> int | None:
+    """min(tokenizer.model_max_length, max_position_embeddings) — 모델이 받을 수 있는 최대 토큰 수"""
+    from transformers import AutoConfig, AutoTokenizer
+
+    config = AutoConfig.from_pretrained(model_name)
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    limits = [
+        limit
+        for limit in (
+            getattr(config, "max_position_embeddings", None),
+            getattr(tokenizer, "model_max_length", None),
+        )
+        if limit
+    ]
+    return int(min(limits)) if limits else None
+
+
+def sentence_transformer_config(model_name: str) -> dict:
+    """
+    sentence-transformers 설정에서 pooling 방식과 max_seq_length 를 읽는다.
+    (modules.json → Pooling 모듈의 config.json, sentence_bert_config.json)
+    설정이 없는 일반 HF 모델은 sentence-transformers 와 같은 기본값
+    (mean pooling, min(tokenizer.model_max_length, max_position_embeddings))을 쓰고,
+    max_length 는 항상 position embedding 크기 이하로 제한한다.
+    """
+    modules = _load_model_file(model_name, "modules.json") or []
+    pooling_dir = next(
+        (m.get("path") for m in modules if m.get("type", "").endswith(".Pooling")), "1_Pooling"
+    )
+    pooling_config = _load_model_file(model_name, f"{pooling_dir}/config.json")
+    st_config = _load_model_file(model_name, "sentence_bert_config.json") or {}
+
+    if pooling_config is None:
+        print("sentence-transformers pooling 설정 없음 → mean pooling 사용:", model_name)
+        pooling = "mean"
+    elif pooling_config.get("pooling_mode_cls_token"):
+        pooling = "cls"
+    elif pooling_config.get("pooling_mode_mean_tokens"):
+        pooling = "mean"
+    else:
+        raise ValueError(f"지원하지 않는 pooling 설정: {pooling_config}")
+
+    limit = _model_length_limit(model_name)
+    max_length = st_config.get("max_seq_length")
+    if max_length is None:
+        if limit is None:
+            print("모델 최대 길이를 알 수 없음 → 512 사용:", model_name)
+        max_length = limit or 512
+    elif limit is not None:
+        max_length = min(int(max_length), limit)
+    return {"pooling": pooling, "max_length": int(max_length)}
+
+
+def _pool(hidden: np.ndarray, attention_mask: np.ndarray, pooling: str) -> np.ndarray:
+    if pooling == "cls":
+        return hidden[:, 0]
+    mask = attention_mask[..., None].astype(hidden.dtype)
+    return (hidden * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+
+class OnnxEmbeddings(Embeddings):
+    """
+    export 로 만든 ONNX 인코더를 onnxruntime 으로 실행하는 임베딩.
+    pooling / max_length 는 export 시 저장한 embedding_config.json
+    (= 모델의 sentence-transformers 설정)을 따른다.
+    """
+
+    def __init__(
+        self,
+        onnx_dir: str,
+        variant: str = "int8",
+        normalize: bool = True,
+        batch_size: int = 32,
+        num_threads: int | None = None,
+    ):
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        model_path = os.path.join(onnx_dir, ONNX_VARIANTS[variant])
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(
+                f"ONNX 모델이 없습니다: {model_path} "
+                "(python -m core.rag.EmbeddingBackend export 로 먼저 생성)"
+            )
+        with open(os.path.join(onnx_dir, CONFIG_FILE), "r", encoding="utf-8") as f:
+            config = json.load(f)
+
+        self.onnx_dir = onnx_dir
+        self.variant = variant
+        if "pooling" not in config or "max_length" not in config:
+            config = {**sentence_transformer_config(config["model_name"]), **config}
+        self.pooling = config["pooling"]
+        self.max_length = config["max_length"]
+        self.normalize = normalize
+        self.batch_size = batch_size
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+        self.session = ort.InferenceSession(
+            model_path, sess_options=options, providers=["CPUExecutionProvider"]
+        )
+        self.input_names = [i.name for i in self.session.get_inputs()]
+        self.tokenizer = AutoTokenizer.from_pretrained(onnx_dir)
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        batch = self.tokenizer(
+            texts,
+            padding=True,
+            truncation=True,
+            max_length=self.max_length,
+            return_tensors="np",
+        )
+        feeds = {name: batch[name].astype(np.int64) for name in self.input_names if name in batch}
+        hidden = self.session.run(None, feeds)[0]
+        vectors = _pool(hidden, batch["attention_mask"], self.pooling)
+        return _normalize(vectors) if self.normalize else vectors
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        # 길이순으로 묶어서 패딩을 줄이고, 결과는 원래 순서로 되돌림
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        vectors = np.zeros((len(texts), 0), dtype=np.float32)
+        for start in range(0, len(order), self.batch_size):
+            idx = order[start : start + self.batch_size]
+            encoded = self._encode([texts[i] for i in idx]).astype(np.float32)
+            if vectors.shape[1] == 0:
+                vectors = np.zeros((len(texts), encoded.shape[1]), dtype=np.float32)
+            vectors[idx] = encoded
+        return vectors.tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._encode([text])[0].astype(np.float32).tolist()
+
+
+# ——— export / parity ———
+def export_onnx(
+    model_name: str,
+    output_dir: str,
+    pooling: str | None = None,
+    max_length: int | None = None,
+    quantize: bool = True,
+    opset: int = 17,
+) -> dict:
+    """
+    HF 인코더를 ONNX(fp32)로 내보내고, quantize=True 면 동적 int8 양자화 모델도 만든다.
+    pooling / max_length 를 주지 않으면 모델의 sentence-transformers 설정을 쓴다.
+    """
+    import torch
+    from transformers import AutoModel, AutoTokenizer
+
+    st_config = sentence_transformer_config(model_name)
+    pooling = pooling or st_config["pooling"]
+    max_length = max_length or st_config["max_length"]
+
+    os.makedirs(output_dir, exist_ok=True)
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = AutoModel.from_pretrained(model_name).eval()
+    tokenizer.save_pretrained(output_dir)
+
+    sample = tokenizer(["ONNX export 샘플 문장", "sample"], padding=True, return_tensors="pt")
+    input_names = list(sample.keys())
+
+    class _Encoder(torch.nn.Module):
+        def __init__(self, encoder):
+            super().__init__()
+            self.encoder = encoder
+
+        def forward(self, *inputs):
+            return self.encoder(**dict(zip(input_names, inputs))).last_hidden_state
+
+    fp32_path = os.path.join(output_dir, ONNX_VARIANTS["fp32"])
+    with torch.no_grad():
+        torch.onnx.export(
+            _Encoder(model),
+            tuple(sample[name] for name in input_names),
+            fp32_path,
+            input_names=input_names,
+            output_names=["last_hidden_state"],
+            dynamic_axes={
+                **{name: {0: "batch", 1: "sequence"} for name in input_names},
+                "last_hidden_state": {0: "batch", 1: "sequence"},
+            },
+            opset_version=opset,
+            dynamo=False,
+        )
+    files = {"fp32": fp32_path}
+
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        int8_path = os.path.join(output_dir, ONNX_VARIANTS["int8"])
+        quantize_dynamic(fp32_path, int8_path, weight_type=QuantType.QInt8)
+        files["int8"] = int8_path
+
+    with open(os.path.join(output_dir, CONFIG_FILE), "w", encoding="utf-8") as f:
+        json.dump(
+            {"model_name": model_name, "pooling": pooling, "max_length": max_length},
+            f,
+            ensure_ascii=False,
+            indent=2,
+        )
+
+    sizes = {k: round(os.path.getsize(p) / (1024 * 1024), 1) for k, p in files.items()}
+    print("ONNX export 완료:", output_dir, sizes)
+    return {"output_dir": output_dir, "size_mb": sizes}
+
+
+def _torch_reference(model_name: str, texts: List[str]):
+    """실제 torch 경로(HuggingFaceEmbeddings.embed_documents)의 임베딩. (벡터, ms)"""
+    embedding = create_embedding(model_name, {"normalize_embeddings": True}, backend="torch")
+    start = time.perf_counter()
+    vectors = np.asarray(embedding.embed_documents(texts), dtype=np.float32)
+    elapsed = (time.perf_counter() - start) * 1000
+    return vectors, elapsed
+
+
+def parity_check(
+    model_name: str,
+    onnx_dir: str,
+    variants: List[str] = ("fp32", "int8"),
+    texts: List[str] | None = None,
+) -> dict:
+    """PyTorch 임베딩과 ONNX 임베딩의 문장별 코사인 유사도 (평균 / 최솟값) 및 지연"""
+    texts = list(texts or PARITY_TEXTS)
+    reference, torch_ms = _torch_reference(model_name, texts)
+    report = {"texts": len(texts), "torch_ms": round(torch_ms, 1)}
+
+    for variant in variants:
+        if not os.path.exists(os.path.join(onnx_dir, ONNX_VARIANTS[variant])):
+            continue
+        embedding = OnnxEmbeddings(onnx_dir, variant=variant)
+        start = time.perf_counter()
+        vectors = np.asarray(embedding.embed_documents(texts))
+        elapsed = (time.perf_counter() - start) * 1000
+        cosine = (vectors * reference).sum(axis=1)
+        report[variant] = {
+            "mean_cosine": round(float(cosine.mean()), 5),
+            "min_cosine": round(float(cosine.min()), 5),
+            "ms": round(elapsed, 1),
+        }
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ONNX 임베딩 모델 export / parity check")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_export = sub.add_parser("export", help="HF 모델 → ONNX (fp32 + 동적 int8)")
+    p_export.add_argument("--model", required=True)
+    p_export.add_argument("--output", default=None)
+    p_export.add_argument("--pooling", choices=["cls", "mean"], default=None,
+                          help="기본: sentence-transformers 설정")
+    p_export.add_argument("--max-length", type=int, default=None,
+                          help="기본: sentence-transformers max_seq_length")
+    p_export.add_argument("--opset", type=int, default=17)
+    p_export.add_argument("--no-quantize", action="store_true")
+
+    p_parity = sub.add_parser("parity", help="PyTorch 출력과 코사인 일치도 비교")
+    p_parity.add_argument("--model", required=True)
+    p_parity.add_argument("--onnx-dir", default=None)
+    p_parity.add_argument("--min-cosine", type=float, default=0.99)
+
+    args = parser.parse_args()
+    if args.command == "export":
+        export_onnx(
+            args.model,
+            args.output or default_onnx_dir(args.model),
+            pooling=args.pooling,
+            max_length=args.max_length,
+            quantize=not args.no_quantize,
+            opset=args.opset,
+        )
+    else:
+        onnx_dir = args.onnx_dir or default_onnx_dir(args.model)
+        report = parity_check(args.model, onnx_dir)
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+        compared = [v["min_cosine"] for k, v in report.items() if k in ONNX_VARIANTS]
+        if not compared:
+            raise SystemExit(f"비교할 ONNX 모델이 없습니다: {onnx_dir} (export 를 먼저 실행)")
+        worst = min(compared)
+        if worst < args.min_cosine:
+            raise SystemExit(f"코사인 일치도 미달: {worst} < {args.min_cosine}")
+
+
+if __name__ == "__main__":
+    main()
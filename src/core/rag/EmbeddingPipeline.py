@@ -0,0 +1,233 @@
+import os
+import time
+import multiprocessing as mp
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, as_completed, wait
+from typing import Callable, Iterable, List
+
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+
+# ——— 워커 프로세스 ———
+# 워커마다 모델을 한 번만 로드하고 배치 단위로 인코딩
+_worker_embedding = None
+
+
+def _init_worker(
+    model_name: str,
+    encode_kwargs: dict,
+    threads_per_worker: int,
+    embedding_config: dict | None = None,
+):
+    os.environ["OMP_NUM_THREADS"] = str(threads_per_worker)
+    os.environ["MKL_NUM_THREADS"] = str(threads_per_worker)
+    os.environ["TOKENIZERS_PARALLELISM"] = "false"
+    try:
+        import torch
+
+        torch.set_num_threads(threads_per_worker)
+    except ImportError:
+        pass
+
+    from core.rag.EmbeddingBackend import create_embedding
+
+    global _worker_embedding
+    _worker_embedding = create_embedding(
+        model_name,
+        encode_kwargs,
+        num_threads=threads_per_worker,
+        **(embedding_config or {}),
+    )
+
+
+def _embed_batch(batch_idx: int, texts: List[str]):
+    return batch_idx, _worker_embedding.embed_documents(texts)
+
+
+class EmbeddingPipeline:
+    """
+    인덱스 빌드용 배치 임베딩 파이프라인.
+
+    - 문서를 길이순으로 정렬해 배치 내 패딩을 최소화
+    - num_workers > 1 이면 워커 프로세스 풀에서 병렬 인코딩
+    - 끝난 배치부터 sink(docs, vectors) 로 흘려보냄 (Chroma 업서트 등)
+    - run_stream 은 문서 iterator 를 버퍼 단위로 받아 전체 목록 없이 처리
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        encode_kwargs: dict | None = None,
+        batch_size: int = 64,
+        num_workers: int = 1,
+        threads_per_worker: int = 1,
+        embedding: Embeddings | None = None,
+        embedding_config: dict | None = None,
+    ):
+        self.model_name = model_name
+        self.encode_kwargs = encode_kwargs or {}
+        self.batch_size = batch_size
+        self.num_workers = num_workers
+        self.threads_per_worker = threads_per_worker
+        # 단일 프로세스 모드에서 재사용할 임베딩 (없으면 워커 초기화 방식으로 로드)
+        self.embedding = embedding
+        # 워커에서 사용할 임베딩 런타임 설정 (backend / onnx_dir / onnx_variant)
+        self.embedding_config = embedding_config or {}
+
+    def _make_batches(self, docs: List[Document]) -> List[List[Document]]:
+        ordered = sorted(docs, key=lambda d: len(d.page_content))
+        return [
+            ordered[i : i + self.batch_size]
+            for i in range(0, len(ordered), self.batch_size)
+        ]
+
+    def run(
+        self,
+        docs: List[Document],
+        sink: Callable[[List[Document], List[List[float]]], None],
+    ) -> dict:
+        batches = self._make_batches(docs)
+        start = time.perf_counter()
+        done = 0
+        finished_batches = 0
+
+        def report(batch):
+            nonlocal done, finished_batches
+            done += len(batch)
+            finished_batches += 1
+            if finished_batches % 20 and finished_batches != len(batches):
+                return
+            elapsed = time.perf_counter() - start
+            print(
+                f"임베딩 진행: {done}/{len(docs)} "
+                f"({done / max(elapsed, 1e-9):.1f} docs/sec)"
+            )
+
+        if self.num_workers <= 1:
+            embedding = self.embedding
+            if embedding is None:
+                _init_worker(
+                    self.model_name,
+                    self.encode_kwargs,
+                    self.threads_per_worker,
+                    self.embedding_config,
+                )
+                embedding = _worker_embedding
+            for batch in batches:
+                vectors = embedding.embed_documents([d.page_content for d in batch])
+                sink(batch, vectors)
+                report(batch)
+        else:
+            # torch 와 fork 는 궁합이 나쁘므로 spawn 사용
+            with ProcessPoolExecutor(
+                max_workers=self.num_workers,
+                mp_context=mp.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(
+                    self.model_name,
+                    self.encode_kwargs,
+                    self.threads_per_worker,
+                    self.embedding_config,
+                ),
+            ) as pool:
+                futures = [
+                    pool.submit(_embed_batch, i, [d.page_content for d in batch])
+                    for i, batch in enumerate(batches)
+                ]
+                for fut in as_completed(futures):
+                    batch_idx, vectors = fut.result()
+                    sink(batches[batch_idx], vectors)
+                    report(batches[batch_idx])
+
+        return self._finish(len(docs), len(batches), start)
+
+    @staticmethod
+    def _finish(n_docs: int, n_batches: int, start: float) -> dict:
+        elapsed = time.perf_counter() - start
+        stats = {
+            "docs": n_docs,
+            "batches": n_batches,
+            "seconds": round(elapsed, 3),
+            "docs_per_sec": round(n_docs / max(elapsed, 1e-9), 1),
+        }
+        print("임베딩 완료:", stats)
+        return stats
+
+    def _stream_batches(self, docs: Iterable[Document], buffer_batches: int):
+        # 버퍼(batch_size * buffer_batches 개)가 찰 때마다 그 안에서만 길이순 정렬 후 배치로 자름
+        buffer = []
+        for doc in docs:
+            buffer.append(doc)
+            if len(buffer) >= self.batch_size * buffer_batches:
+                yield from self._make_batches(buffer)
+                buffer = []
+        if buffer:
+            yield from self._make_batches(buffer)
+
+    def run_stream(
+        self,
+        docs: Iterable[Document],
+        sink: Callable[[List[Document], List[List[float]]], None],
+        buffer_batches: int = 16,
+    ) -> dict:
+        """
+        문서 iterator 를 받아서 도착하는 대로 임베딩.
+        메모리에는 버퍼 하나와 처리 중인 배치(워커 수 * 2)만 유지된다.
+        """
+        start = time.perf_counter()
+        done = 0
+        n_batches = 0
+
+        def report(batch):
+            nonlocal done, n_batches
+            done += len(batch)
+            n_batches += 1
+            if n_batches % 20 == 0:
+                elapsed = time.perf_counter() - start
+                print(f"임베딩 진행: {done} ({done / max(elapsed, 1e-9):.1f} docs/sec)")
+
+        batches = self._stream_batches(docs, buffer_batches)
+        if self.num_workers <= 1:
+            embedding = self.embedding
+            if embedding is None:
+                _init_worker(
+                    self.model_name,
+                    self.encode_kwargs,
+                    self.threads_per_worker,
+                    self.embedding_config,
+                )
+                embedding = _worker_embedding
+            for batch in batches:
+                sink(batch, embedding.embed_documents([d.page_content for d in batch]))
+                report(batch)
+            return self._finish(done, n_batches, start)
+
+        with ProcessPoolExecutor(
+            max_workers=self.num_workers,
+            mp_context=mp.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(
+                self.model_name,
+                self.encode_kwargs,
+                self.threads_per_worker,
+                self.embedding_config,
+            ),
+        ) as pool:
+            in_flight = {}
+
+            def drain(futures):
+                for fut in futures:
+                    batch = in_flight.pop(fut)
+                    _, vectors = fut.result()
+                    sink(batch, vectors)
+                    report(batch)
+
+            for batch in batches:
+                fut = pool.submit(_embed_batch, 0, [d.page_content for d in batch])
+                in_flight[fut] = batch
+                if len(in_flight) >= self.num_workers * 2:
+                    finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    drain(finished)
+            drain(list(in_flight))
+
+        return self._finish(done, n_batches, start)
@@ -0,0 +1,118 @@
+import zlib
+from typing import Dict, List
+
+import numpy as np
+from langchain_core.documents import Document
+
+from core.rag.BM25Index import ko_en_tokenize
+
+
+class QADeduplicator:
+    """
+    MinHash + LSH 기반 근접 중복 QA 쌍 제거.
+
+    - 문서를 토큰 n-gram(shingle) 집합으로 보고 MinHash 서명(num_perm 개)을 계산
+    - 서명을 bands 개 구간으로 나눠 같은 구간 값을 가진 대표 문서만 후보로 비교 (LSH)
+    - 추정 Jaccard 유사도가 threshold 이상이면 먼저 들어온 대표 문서에 합치고,
+      합쳐진 문서 수 / 출처 / 문서 ID 를 대표 문서의 메타데이터로 남긴다
+    - 대표는 입력 순서상 처음 나온 문서 (QA 폴더는 이름순으로 읽으므로 실행마다 같음)
+    - add() 로 문서를 하나씩 넣을 수 있어서 스트리밍 적재 중에도 사용 가능
+    """
+
+    # 2^31 - 1 (메르센 소수): a * x 가 uint64 안에서 넘치지 않도록 31비트 해시 사용
+    _PRIME = np.uint64((1 << 31) - 1)
+
+    def __init__(
+        self,
+        threshold: float = 0.8,
+        num_perm: int = 128,
+        bands: int = 16,
+        shingle_size: int = 3,
+        seed: int = 42,
+    ):
+        if num_perm % bands:
+            raise ValueError("num_perm 은 bands 의 배수여야 합니다")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, (1 << 31) - 1, size=num_perm).astype(np.uint64)
+        self._b = rng.randint(0, (1 << 31) - 1, size=num_perm).astype(np.uint64)
+        self.reset()
+
+    def reset(self):
+        # band 별 {구간 값: 대표 번호 목록}, 대표 문서의 서명 / ID / 출처
+        self._buckets: List[Dict[bytes, List[int]]] = [{} for _ in range(self.bands)]
+        self._signatures: List[np.ndarray] = []
+        self._kept_ids: List[str] = []
+        self._kept_sources: List[str] = []
+        # 대표 번호 -> 합쳐진 문서들의 출처 (대표 자신 포함) / 대표에 합쳐진 문서 ID
+        self._merged: Dict[int, List[str]] = {}
+        self._merged_ids: Dict[int, List[str]] = {}
+        self.seen = 0
+
+    def _shingles(self, text: str) -> np.ndarray:
+        tokens = ko_en_tokenize(text)
+        n = self.shingle_size
+        if len(tokens) < n:
+            grams = [" ".join(tokens)]
+        else:
+            grams = {" ".join(tokens[i : i + n]) for i in range(len(tokens) - n + 1)}
+        return np.asarray(
+            [zlib.crc32(g.encode("utf-8")) & 0x7FFFFFFF for g in grams], dtype=np.uint64
+        )
+
+    def signature(self, text: str) -> np.ndarray:
+        x = self._shingles(text)
+        hashed = (self._a[:, None] * x[None, :] + self._b[:, None]) % self._PRIME
+        # 값이 2^31 보다 작으므로 uint32 로 저장 (문서당 num_perm * 4 byte)
+        return hashed.min(axis=1).astype(np.uint32)
+
+    def add(self, doc: Document) -> bool:
+        """새 대표 문서면 True, 기존 대표에 합쳐졌으면 False"""
+        self.seen += 1
+        sig = self.signature(doc.page_content)
+        keys = [sig[b * self.rows : (b + 1) * self.rows].tobytes() for b in range(self.bands)]
+
+        candidates = set()
+        for bucket, key in zip(self._buckets, keys):
+            candidates.update(bucket.get(key, ()))
+        # LSH 후보는 추정 Jaccard 로 한 번 더 확인 (가장 먼저 들어온 대표 우선)
+        for idx in sorted(candidates):
+            if np.mean(self._signatures[idx] == sig) >= self.threshold:
+                sources = self._merged.setdefault(idx, [self._kept_sources[idx]])
+                sources.append(doc.metadata.get("pages_dir", ""))
+                self._merged_ids.setdefault(idx, []).append(doc.id)
+                return False
+
+        idx = len(self._kept_ids)
+        self._signatures.append(sig)
+        self._kept_ids.append(doc.id)
+        self._kept_sources.append(doc.metadata.get("pages_dir", ""))
+        for bucket, key in zip(self._buckets, keys):
+            bucket.setdefault(key, []).append(idx)
+        return True
+
+    def merged_metadata(self) -> Dict[str, dict]:
+        """대표 문서 ID -> 대표 메타데이터에 추가할 병합 정보"""
+        return {
+            self._kept_ids[idx]: {
+                "merged_count": len(sources),
+                # Chroma 메타데이터는 스칼라만 허용 → 출처는 문자열로 이어 붙임
+                "merged_sources": ",".join(sorted({s for s in sources if s})),
+                "merged_ids": ",".join(self._merged_ids[idx]),
+            }
+            for idx, sources in self._merged.items()
+        }
+
+    def report(self) -> dict:
+        kept = len(self._kept_ids)
+        removed = self.seen - kept
+        print(
+            f"근접 중복 QA 제거: {self.seen} -> {kept} "
+            f"(-{removed}, {removed / max(self.seen, 1):.1%})"
+        )
+        return {"seen": self.seen, "kept": kept, "removed": removed}
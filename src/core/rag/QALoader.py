@@ -0,0 +1,74 @@
+import os
+import re
+import json
+import multiprocessing as mp
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List, Tuple
+
+QA_PATTERN = re.compile(r"Q(\d+):\s*(.+?)\nA\1:\s*(.+?)(?=(\nQ\d+:)|$)", re.DOTALL)
+_SOURCE_PATTERN = re.compile(r"출처:.*", re.DOTALL)
+
+
+def parse_qa_pairs(text: str) -> List[Tuple[str, str]]:
+    """"Q1: ... A1: ..." 형식 텍스트에서 (question, answer) 목록 추출 (답변의 '출처:' 이후는 제거)"""
+    pairs = []
+    for m in QA_PATTERN.finditer(text):
+        q = m.group(2).strip()
+        a = m.group(3).strip()
+        a = _SOURCE_PATTERN.sub("", a).strip()
+        if q and a:
+            pairs.append((q, a))
+    return pairs
+
+
+def list_pages_dirs(base_dir: str) -> List[str]:
+    # 실행할 때마다 같은 순서로 읽도록 정렬 (문서 순서 / 중복 대표 선택이 결정적)
+    return [
+        os.path.join(base_dir, d)
+        for d in sorted(os.listdir(base_dir))
+        if d.endswith("_pages") and os.path.isdir(os.path.join(base_dir, d))
+    ]
+
+
+def parse_pages_folder(folder: str) -> List[Tuple[str, str, str]]:
+    """pages 폴더 하나의 qa_dataset.jsonl → (question, answer, pages 폴더명) 목록 (워커 프로세스에서 실행)"""
+    jsonl_path = os.path.join(folder, "qa_dataset.jsonl")
+    if not os.path.exists(jsonl_path):
+        return []
+
+    provenance = os.path.basename(folder)
+    records = []
+    with open(jsonl_path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            qa_text = json.loads(line).get("qa_pair", "")
+            if qa_text:
+                records.extend((q, a, provenance) for q, a in parse_qa_pairs(qa_text))
+    return records
+
+
+def iter_qa_records(base_dir: str, workers: int = 1) -> Iterator[Tuple[str, str, str]]:
+    """
+    (question, answer, pages 폴더명) 레코드를 폴더 단위로 흘려보내는 generator.
+
+    workers > 1 이면 워커 프로세스들이 폴더를 미리 파싱해 두고(최대 workers * 2 개),
+    소비하는 쪽(임베딩)이 도는 동안 다음 폴더 파싱이 겹쳐서 진행된다.
+    순서는 항상 정렬된 폴더 순서와 같다.
+    """
+    folders = list_pages_dirs(base_dir)
+    if workers <= 1:
+        for folder in folders:
+            yield from parse_pages_folder(folder)
+        return
+
+    # 부모 프로세스에 torch 가 올라와 있을 수 있으므로 spawn 사용
+    with ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context("spawn")) as pool:
+        pending = deque()
+        next_folder = 0
+        while pending or next_folder < len(folders):
+            while next_folder < len(folders) and len(pending) < workers * 2:
+                pending.append(pool.submit(parse_pages_folder, folders[next_folder]))
+                next_folder += 1
+            yield from pending.popleft().result()
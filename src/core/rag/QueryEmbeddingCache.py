@@ -0,0 +1,98 @@
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Callable, List
+
+import numpy as np
+
+
+class QueryEmbeddingCache:
+    """
+    질의 임베딩 LRU 캐시.
+
+    정규화한 질의 문자열을 키로 임베딩 벡터(float32)를 보관하고,
+    메모리 상한(max_bytes)을 넘으면 가장 오래 쓰이지 않은 항목부터 제거한다.
+    """
+
+    # 키 문자열/OrderedDict 노드 등 벡터 외 부가 비용 (대략치)
+    ENTRY_OVERHEAD = 128
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, np.ndarray] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def normalize(query: str) -> str:
+        # 유니코드 정규화 + 대소문자 무시 + 연속 공백 축약
+        query = unicodedata.normalize("NFKC", query)
+        return " ".join(query.casefold().split())
+
+    def _entry_size(self, key: str, vector: np.ndarray) -> int:
+        return vector.nbytes + len(key.encode("utf-8")) + self.ENTRY_OVERHEAD
+
+    def get(self, query: str) -> np.ndarray | None:
+        key = self.normalize(query)
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return vector
+
+    def put(self, query: str, vector) -> np.ndarray:
+        key = self.normalize(query)
+        vector = np.asarray(vector, dtype=np.float32)
+        size = self._entry_size(key, vector)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= self._entry_size(key, old)
+            if size > self.max_bytes:
+                return vector
+            self._entries[key] = vector
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                old_key, old_vec = self._entries.popitem(last=False)
+                self._bytes -= self._entry_size(old_key, old_vec)
+        return vector
+
+    def get_or_compute(self, query: str, embed_fn: Callable[[str], List[float]]) -> np.ndarray:
+        vector = self.get(query)
+        if vector is None:
+            vector = self.put(query, embed_fn(query))
+        return vector
+
+    def get_or_compute_many(
+        self, queries: List[str], embed_many_fn: Callable[[List[str]], List[List[float]]]
+    ) -> List[np.ndarray]:
+        """여러 질의를 한 번에 조회하고, 캐시에 없는 질의만 모아서 한 번의 배치 호출로 임베딩"""
+        vectors = [self.get(q) for q in queries]
+        missing = [i for i, v in enumerate(vectors) if v is None]
+        if missing:
+            computed = embed_many_fn([queries[i] for i in missing])
+            for i, vec in zip(missing, computed):
+                vectors[i] = self.put(queries[i], vec)
+        return vectors
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
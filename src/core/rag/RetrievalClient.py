@@ -0,0 +1,146 @@
+import json
+import time
+import socket
+import threading
+import http.client
+from typing import List
+from urllib.parse import urlparse
+
+from langchain_core.documents import Document
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, socket_path: str, timeout: float):
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        sock.connect(self.socket_path)
+        self.sock = sock
+
+
+class RetrievalClient:
+    """
+    RetrievalServer 용 얇은 클라이언트 (표준 라이브러리만 사용, 모델/인덱스 로드 없음).
+
+    url 예시: "http://127.0.0.1:8765", "unix:///tmp/axriv-retriever.sock"
+    hybrid_search / hybrid_search_many 는 AxrivRetriever 와 같은 인자/반환 형식이며,
+    넘기지 않은 인자(None)는 서버 쪽 기본값을 따른다.
+    연결은 스레드별로 재사용한다.
+    """
+
+    def __init__(self, url: str, timeout: float = 30.0):
+        self.url = url
+        self.timeout = timeout
+        parsed = urlparse(url)
+        if parsed.scheme == "unix":
+            self._socket_path = parsed.path
+            self._host = None
+        elif parsed.scheme == "http":
+            self._socket_path = None
+            self._host = (parsed.hostname, parsed.port or 80)
+        else:
+            raise ValueError(f"지원하지 않는 검색 서버 URL: {url}")
+        self._local = threading.local()
+
+    def _connection(self) -> http.client.HTTPConnection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            if self._socket_path:
+                conn = _UnixHTTPConnection(self._socket_path, self.timeout)
+            else:
+                conn = http.client.HTTPConnection(*self._host, timeout=self.timeout)
+            self._local.conn = conn
+        return conn
+
+    def _request(self, method: str, path: str, payload: dict | None = None):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8") if payload else None
+        headers = {"Content-Type": "application/json"} if body else {}
+        # 서버 재시작 등으로 끊긴 keep-alive 연결은 한 번만 다시 연결해서 재시도
+        for attempt in range(2):
+            conn = self._connection()
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                response = conn.getresponse()
+                raw = response.read()
+            except (ConnectionError, http.client.HTTPException, OSError):
+                conn.close()
+                self._local.conn = None
+                if attempt:
+                    raise
+                continue
+            try:
+                data = json.loads(raw or b"null")
+            except ValueError:
+                # 프록시 / 서버 내부 오류 등 JSON 이 아닌 본문은 텍스트 그대로 전달
+                data = raw.decode("utf-8", errors="replace")
+            return response.status, data
+
+    @staticmethod
+    def _to_documents(items: List[dict]) -> List[Document]:
+        return [
+            Document(id=d["id"], page_content=d["page_content"], metadata=d["metadata"])
+            for d in items
+        ]
+
+    @staticmethod
+    def _params(k, w_dense, w_bm25, fusion, rrf_k, filters) -> dict:
+        params = {"k": k, "w_dense": w_dense, "w_bm25": w_bm25, "fusion": fusion, "rrf_k": rrf_k}
+        params = {key: value for key, value in params.items() if value is not None}
+        if filters:
+            params["filters"] = filters
+        return params
+
+    def health(self) -> dict:
+        _, data = self._request("GET", "/health")
+        return data
+
+    def wait_until_ready(self, timeout: float = 600.0, interval: float = 1.0) -> dict:
+        """서버의 모델/인덱스 로드가 끝날 때까지 대기"""
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                status, data = self._request("GET", "/health")
+                if status == 200:
+                    return data
+                if isinstance(data, dict) and data.get("error"):
+                    raise RuntimeError(f"검색 서버 로드 실패: {data['error']}")
+            except OSError:
+                pass
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"검색 서버 준비 대기 시간 초과: {self.url}")
+            time.sleep(interval)
+
+    def hybrid_search(
+        self,
+        query: str,
+        k: int | None = None,
+        w_dense: float | None = None,
+        w_bm25: float | None = None,
+        fusion: str | None = None,
+        rrf_k: int | None = None,
+        filters: dict | None = None,
+    ) -> List[Document]:
+        payload = self._params(k, w_dense, w_bm25, fusion, rrf_k, filters)
+        status, data = self._request("POST", "/search", {"query": query, **payload})
+        if status != 200:
+            raise RuntimeError(f"검색 서버 오류 ({status}): {data}")
+        return self._to_documents(data["results"])
+
+    def hybrid_search_many(
+        self,
+        queries: List[str],
+        k: int | None = None,
+        w_dense: float | None = None,
+        w_bm25: float | None = None,
+        filters: dict | None = None,
+        fusion: str | None = None,
+        rrf_k: int | None = None,
+    ) -> List[List[Document]]:
+        payload = self._params(k, w_dense, w_bm25, fusion, rrf_k, filters)
+        status, data = self._request("POST", "/search_many", {"queries": queries, **payload})
+        if status != 200:
+            raise RuntimeError(f"검색 서버 오류 ({status}): {data}")
+        return [self._to_documents(items) for items in data["results"]]
@@ -0,0 +1,248 @@
+"""
+검색 전용 서버 프로세스.
+
+모델 / 벡터 저장소 / BM25 를 이 프로세스 하나만 올리고, API 워커나 노트북은
+RetrievalClient 로 HTTP(또는 Unix 소켓)를 통해 검색한다.
+짧은 시간(max_wait_ms) 안에 들어온 요청은 모아서 hybrid_search_many 한 번으로 처리.
+
+실행 (src 디렉터리에서):
+    python -m core.rag.RetrievalServer --uds /tmp/axriv-retriever.sock
+    python -m core.rag.RetrievalServer --host 127.0.0.1 --port 8765
+
+클라이언트 쪽에서는 AXRIV_RETRIEVER_URL=unix:///tmp/axriv-retriever.sock 처럼 지정.
+"""
+import json
+import time
+import asyncio
+import argparse
+import threading
+from contextlib import asynccontextmanager
+from typing import Callable, List, Literal
+
+import uvicorn
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from core.rag.AxrivRetriever import AxrivRetriever
+from core.rag.SemanticResultCache import SemanticResultCache
+
+
+class SearchRequest(BaseModel):
+    query: str
+    k: int = AxrivRetriever.default_k
+    w_dense: float = AxrivRetriever.default_w_dense
+    w_bm25: float = AxrivRetriever.default_w_bm25
+    fusion: Literal["weighted", "rrf"] = AxrivRetriever.default_fusion
+    rrf_k: int = AxrivRetriever.default_rrf_k
+    filters: dict | None = None
+
+
+class SearchManyRequest(BaseModel):
+    queries: List[str]
+    k: int = AxrivRetriever.default_k
+    w_dense: float = AxrivRetriever.default_w_dense
+    w_bm25: float = AxrivRetriever.default_w_bm25
+    fusion: Literal["weighted", "rrf"] = AxrivRetriever.default_fusion
+    rrf_k: int = AxrivRetriever.default_rrf_k
+    filters: dict | None = None
+
+
+def _serialize(docs) -> List[dict]:
+    return [{"id": d.id, "page_content": d.page_content, "metadata": d.metadata} for d in docs]
+
+
+class RetrievalServer:
+    """
+    retriever(기본: ShardedRetriever)를 감싸는 FastAPI 앱.
+
+    - 시작하면 백그라운드 스레드에서 retriever 로드 + 워밍업, 끝나기 전까지 /health 는 503
+    - /search 요청은 큐에 쌓였다가 검색 조건이 같은 것끼리 한 번의 배치 검색으로 처리
+    - 의미상 같은 질의는 SemanticResultCache 로 재사용 (모든 워커가 캐시를 공유하는 효과)
+    """
+
+    def __init__(
+        self,
+        retriever_factory: Callable | None = None,
+        max_batch: int = 32,
+        max_wait_ms: float = 5.0,
+        result_cache: SemanticResultCache | None = None,
+    ):
+        if retriever_factory is None:
+            from core.rag.ShardedRetriever import ShardedRetriever
+
+            retriever_factory = ShardedRetriever
+        self.retriever_factory = retriever_factory
+        self.max_batch = max_batch
+        self.max_wait_ms = max_wait_ms
+        self.result_cache = result_cache or SemanticResultCache()
+
+        self.retriever = None
+        self._ready = threading.Event()
+        self._load_error = None
+        self._queue: asyncio.Queue | None = None
+
+        self.batches = 0
+        self.batched_queries = 0
+
+        self.app = FastAPI(lifespan=self._lifespan)
+        self.app.get("/health")(self.health)
+        self.app.post("/search")(self.search)
+        self.app.post("/search_many")(self.search_many)
+
+    # ——— 로드 / 워밍업 ———
+    def _load(self):
+        try:
+            retriever = self.retriever_factory()
+            retriever.hybrid_search(AxrivRetriever.warmup_query)
+            self.retriever = retriever
+            self._ready.set()
+            print("검색 서버 준비 완료")
+        except Exception as e:
+            self._load_error = e
+            print("검색 서버 retriever 로드 실패", e)
+
+    @asynccontextmanager
+    async def _lifespan(self, app: FastAPI):
+        self._queue = asyncio.Queue()
+        threading.Thread(target=self._load, name="axriv-server-load", daemon=True).start()
+        batcher = asyncio.create_task(self._batch_loop())
+        yield
+        batcher.cancel()
+
+    # ——— 배치 처리 ———
+    async def _next_batch(self) -> list:
+        batch = [await self._queue.get()]
+        deadline = time.monotonic() + self.max_wait_ms / 1000
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _batch_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._next_batch()
+            try:
+                await self._run_batch(loop, batch)
+            except Exception as e:
+                # 묶는 과정 등에서 실패해도 대기 중인 요청이 멈추지 않도록 예외를 전달
+                print("검색 배치 처리 실패", e)
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+            self.batches += 1
+            self.batched_queries += len(batch)
+
+    async def _run_batch(self, loop, batch: list):
+        # 검색 조건(k, filters, fusion ...)이 같은 요청끼리 묶음
+        groups = {}
+        for request, future in batch:
+            params = request.model_dump(exclude={"query"})
+            key = json.dumps(params, sort_keys=True, ensure_ascii=False)
+            groups.setdefault(key, (params, []))[1].append((request.query, future))
+
+        for params, items in groups.values():
+            queries = [q for q, _ in items]
+            try:
+                results = await loop.run_in_executor(None, self._search_many, queries, params)
+            except Exception as e:
+                for _, future in items:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            for (_, future), docs in zip(items, results):
+                if not future.done():
+                    future.set_result(docs)
+
+    def _search_many(self, queries: List[str], params: dict):
+        """결과 캐시를 먼저 보고, 없는 질의만 한 번의 hybrid_search_many 로 검색"""
+        retriever = self.retriever
+        vectors = retriever.query_cache.get_or_compute_many(
+            queries, retriever.embedding.embed_documents
+        )
+        scope = json.dumps(params, sort_keys=True, ensure_ascii=False)
+        version = retriever.index_version
+
+        results = [self.result_cache.get(v, scope, version) for v in vectors]
+        missing = [i for i, r in enumerate(results) if r is None]
+        if missing:
+            start = time.perf_counter()
+            searched = retriever.hybrid_search_many(
+                [queries[i] for i in missing],
+                k=params["k"],
+                w_dense=params["w_dense"],
+                w_bm25=params["w_bm25"],
+                filters=params["filters"],
+                fusion=params["fusion"],
+                rrf_k=params["rrf_k"],
+            )
+            latency_ms = (time.perf_counter() - start) * 1000 / len(missing)
+            for i, docs in zip(missing, searched):
+                docs = _serialize(docs)
+                self.result_cache.put(vectors[i], scope, docs, version, latency_ms)
+                results[i] = docs
+        return results
+
+    # ——— 엔드포인트 ———
+    def _not_ready(self):
+        return JSONResponse(status_code=503, content=self.status())
+
+    async def search(self, request: SearchRequest):
+        if not self._ready.is_set():
+            return self._not_ready()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((request, future))
+        return {"results": await future}
+
+    async def search_many(self, request: SearchManyRequest):
+        if not self._ready.is_set():
+            return self._not_ready()
+        params = request.model_dump(exclude={"queries"})
+        loop = asyncio.get_running_loop()
+        results = await loop.run_in_executor(None, self._search_many, request.queries, params)
+        return {"results": results}
+
+    def status(self) -> dict:
+        return {
+            "ready": self._ready.is_set(),
+            "error": str(self._load_error) if self._load_error else None,
+            "batches": self.batches,
+            "avg_batch_size": round(self.batched_queries / self.batches, 2) if self.batches else 0.0,
+            "result_cache": self.result_cache.stats(),
+            "query_cache": self.retriever.query_cache.stats() if self.retriever else None,
+        }
+
+    async def health(self):
+        status = self.status()
+        return JSONResponse(status_code=200 if status["ready"] else 503, content=status)
+
+    def run(self, host: str = "127.0.0.1", port: int = 8765, uds: str | None = None):
+        # 모델을 한 번만 올리는 것이 목적이므로 워커는 1개
+        if uds:
+            uvicorn.run(self.app, uds=uds, workers=1)
+        else:
+            uvicorn.run(self.app, host=host, port=port, workers=1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AxrivRetriever 검색 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--uds", default=None, help="Unix 소켓 경로 (지정하면 host/port 대신 사용)")
+    parser.add_argument("--max-batch", type=int, default=32)
+    parser.add_argument("--max-wait-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    server = RetrievalServer(max_batch=args.max_batch, max_wait_ms=args.max_wait_ms)
+    server.run(host=args.host, port=args.port, uds=args.uds)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable
+
+import numpy as np
+
+
+class SemanticResultCache:
+    """
+    의미 기반 검색 결과 캐시.
+
+    질의 임베딩끼리의 코사인 유사도가 threshold 이상인 과거 질의가 있으면
+    그 질의의 검색 결과를 그대로 돌려준다 ("multi-agent memory architectures" ≒
+    "memory designs for multi-agent systems").
+
+    - 검색 조건(k, filters 등)이 다른 결과는 섞이지 않도록 scope 가 같은 항목끼리만 비교
+    - ttl_seconds 가 지난 항목은 무효, max_entries 를 넘으면 가장 오래 안 쓰인 항목부터 제거
+    - index_version 이 바뀌면(재색인/증분 인덱싱) 전체 비움
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.95,
+        ttl_seconds: float = 3600.0,
+        max_entries: int = 1024,
+    ):
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+
+        # 항목 ID -> (scope, 질의 벡터, 결과, 생성 시각, 원래 검색 시간 ms)
+        self._entries: OrderedDict[int, tuple] = OrderedDict()
+        self._next_id = 0
+        self._index_version = None
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.saved_ms = 0.0
+
+    def _sync_version(self, index_version: Hashable):
+        if index_version != self._index_version:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self._index_version = index_version
+
+    def _expire(self, now: float):
+        expired = [
+            entry_id
+            for entry_id, (_, _, _, created, _) in self._entries.items()
+            if now - created > self.ttl_seconds
+        ]
+        for entry_id in expired:
+            del self._entries[entry_id]
+        self.evictions += len(expired)
+
+    def get(self, vector, scope: Hashable, index_version: Hashable) -> Any | None:
+        vector = np.asarray(vector, dtype=np.float32)
+        now = time.monotonic()
+        with self._lock:
+            self._sync_version(index_version)
+            self._expire(now)
+
+            candidates = [
+                (entry_id, entry[1])
+                for entry_id, entry in self._entries.items()
+                if entry[0] == scope
+            ]
+            if candidates:
+                # 정규화된 임베딩이므로 내적 = 코사인 유사도
+                sims = np.stack([v for _, v in candidates]) @ vector
+                best = int(np.argmax(sims))
+                if sims[best] >= self.threshold:
+                    entry_id = candidates[best][0]
+                    self._entries.move_to_end(entry_id)
+                    _, _, results, _, latency_ms = self._entries[entry_id]
+                    self.hits += 1
+                    self.saved_ms += latency_ms
+                    return results
+
+            self.misses += 1
+            return None
+
+    def put(
+        self,
+        vector,
+        scope: Hashable,
+        results: Any,
+        index_version: Hashable,
+        latency_ms: float = 0.0,
+    ):
+        vector = np.asarray(vector, dtype=np.float32)
+        with self._lock:
+            self._sync_version(index_version)
+            self._entries[self._next_id] = (scope, vector, results, time.monotonic(), latency_ms)
+            self._next_id += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "saved_ms": round(self.saved_ms, 1),
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
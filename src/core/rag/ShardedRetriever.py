@@ -0,0 +1,184 @@
+import os
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple
+
+from langchain_core.documents import Document
+
+from utils.helper import get_project_root
+from core.rag.AxrivRetriever import AxrivRetriever
+from core.rag.QueryEmbeddingCache import QueryEmbeddingCache
+from core.rag.EmbeddingBackend import create_embedding, resolve_embedding_config
+
+
+class ShardedRetriever:
+    """
+    도메인(src/data/<domain>)별 AxrivRetriever 샤드 묶음.
+
+    - 샤드마다 벡터 저장소 / BM25 인덱스를 따로 두고, 임베딩 모델과 질의 임베딩 캐시는 공유
+    - filters 에 domain 이 있으면 해당 샤드만 검색하고 나머지 조건은 샤드 안에서 적용
+    - domain 조건이 없으면 모든 샤드에 동시에 보내고(scatter), 샤드별 dense / BM25 원점수를
+      모아서 한 번만 융합(gather). 샤드마다 BM25 최댓값 / 순위가 달라 융합 점수끼리는 비교할 수 없기 때문
+      (BM25 의 IDF 는 샤드 단위로 계산된 값을 그대로 씀)
+    - 샤딩 이전의 단일 저장소(legacy_persist_dir, src/data/agent 로 빌드)가 있으면
+      legacy_domain 샤드로 그대로 재사용하고 도메인/논문 메타데이터만 채움 (재임베딩 없음)
+    """
+
+    def __init__(
+        self,
+        data_dir: str = str(get_project_root() / "src" / "data"),
+        domains: List[str] | None = None,
+        persist_root: str = str(get_project_root() / ".chroma_shards"),
+        legacy_persist_dir: str | None = str(get_project_root() / ".chroma_db"),
+        legacy_domain: str = "agent",
+        collection_name: str = "qa_collection",
+        query_cache_bytes: int = 64 * 1024 * 1024,
+        search_workers: int = 4,
+        embedding_backend: str | None = None,
+        onnx_dir: str | None = None,
+        onnx_variant: str | None = None,
+        **retriever_kwargs,
+    ):
+        self.data_dir = data_dir
+        self.persist_root = persist_root
+        if domains is None:
+            domains = sorted(
+                d for d in os.listdir(data_dir) if os.path.isdir(os.path.join(data_dir, d))
+            )
+
+        embedding_config = resolve_embedding_config(
+            AxrivRetriever.FIXED_MODEL_NAME, embedding_backend, onnx_dir, onnx_variant
+        )
+        self.embedding = create_embedding(
+            AxrivRetriever.FIXED_MODEL_NAME, AxrivRetriever.ENCODE_KWARGS, **embedding_config
+        )
+        self.query_cache = QueryEmbeddingCache(max_bytes=query_cache_bytes)
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, len(domains)), thread_name_prefix="axriv-shard"
+        )
+
+        self.shards: Dict[str, AxrivRetriever] = {}
+        for domain in domains:
+            persist_dir = os.path.join(persist_root, domain)
+            legacy = (
+                domain == legacy_domain
+                and legacy_persist_dir is not None
+                and retriever_kwargs.get("vector_backend", "chroma") == "chroma"
+                and not os.path.exists(persist_dir)
+                and os.path.exists(legacy_persist_dir)
+            )
+            if legacy:
+                print(f"기존 단일 저장소를 {domain} 샤드로 재사용:", legacy_persist_dir)
+                persist_dir = legacy_persist_dir
+            self.shards[domain] = AxrivRetriever(
+                base_dir=os.path.join(data_dir, domain),
+                collection_name=collection_name,
+                persist_dir=persist_dir,
+                search_workers=search_workers,
+                embedding=self.embedding,
+                query_cache=self.query_cache,
+                embedding_backend=embedding_config["backend"],
+                onnx_dir=embedding_config.get("onnx_dir"),
+                onnx_variant=embedding_config.get("onnx_variant"),
+                **retriever_kwargs,
+            )
+            # 샤딩 이전 저장소에는 domain / paper_id 메타데이터가 없음 → 처음 한 번만 메타데이터 갱신
+            if legacy and not self.shards[domain]._load_manifest()[1]:
+                self.shards[domain].ingest()
+            print(f"샤드 로드: {domain} ({len(self.shards[domain].docs)} docs)")
+
+    @property
+    def domains(self) -> List[str]:
+        return list(self.shards)
+
+    @property
+    def index_version(self) -> tuple:
+        # 어느 샤드든 다시 색인되면 바뀜
+        return tuple(shard.index_version for shard in self.shards.values())
+
+    def _route(self, filters: dict | None) -> Tuple[List[AxrivRetriever], dict | None]:
+        """domain 조건으로 검색할 샤드를 고르고, 샤드 안에서 적용할 나머지 조건을 돌려준다"""
+        filters = dict(filters or {})
+        domain = filters.pop("domain", None)
+        if domain is None:
+            names = list(self.shards)
+        else:
+            names = domain if isinstance(domain, (list, tuple, set)) else [domain]
+        # 문서가 없는 샤드는 검색하지 않음
+        shards = [self.shards[n] for n in names if n in self.shards and len(self.shards[n].docs)]
+        return shards, filters or None
+
+    @staticmethod
+    def _merge_hits(per_shard_hits: List[list], k: int) -> list:
+        """샤드별 (행, 원점수) → ((샤드 번호, 행), 원점수) 전역 상위 k 개"""
+        merged = [
+            ((si, row), score) for si, hits in enumerate(per_shard_hits) for row, score in hits
+        ]
+        merged.sort(key=lambda x: x[1], reverse=True)
+        return merged[:k]
+
+    def _gather(
+        self, shards: List[AxrivRetriever], per_shard: list, k, w_dense, w_bm25, fusion, rrf_k
+    ) -> List[Document]:
+        # 전역으로 합친 히트에서 BM25 최댓값 정규화 / RRF 순위를 계산하도록 융합은 한 번만
+        dense_hits = self._merge_hits([dense for dense, _ in per_shard], k)
+        bm25_hits = self._merge_hits([bm25 for _, bm25 in per_shard], k)
+        fused = shards[0]._fuse(dense_hits, bm25_hits, k, w_dense, w_bm25, fusion, rrf_k)
+        return [shards[si].docs.document(row, score=float(score)) for (si, row), score in fused]
+
+    def hybrid_search(
+        self,
+        query: str,
+        k: int = AxrivRetriever.default_k,
+        w_dense: float = AxrivRetriever.default_w_dense,
+        w_bm25: float = AxrivRetriever.default_w_bm25,
+        fusion: str = AxrivRetriever.default_fusion,
+        rrf_k: int = AxrivRetriever.default_rrf_k,
+        filters: dict | None = None,
+    ) -> List[Document]:
+        shards, shard_filters = self._route(filters)
+        if not shards:
+            return []
+
+        # 질의 임베딩은 한 번만 계산 → 각 샤드는 공유 캐시에서 꺼내 씀
+        self.query_cache.get_or_compute(query, self.embedding.embed_query)
+
+        def search(shard: AxrivRetriever):
+            return shard.hybrid_hits(query, k, filters=shard_filters)
+
+        per_shard = list(self._executor.map(search, shards))
+        return self._gather(shards, per_shard, k, w_dense, w_bm25, fusion, rrf_k)
+
+    async def ahybrid_search(self, query: str, **kwargs) -> List[Document]:
+        """hybrid_search 의 async 버전 (샤드 검색은 executor 에서 실행)"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, lambda: self.hybrid_search(query, **kwargs))
+
+    def hybrid_search_many(
+        self,
+        queries: List[str],
+        k: int = AxrivRetriever.default_k,
+        w_dense: float = AxrivRetriever.default_w_dense,
+        w_bm25: float = AxrivRetriever.default_w_bm25,
+        filters: dict | None = None,
+        fusion: str = AxrivRetriever.default_fusion,
+        rrf_k: int = AxrivRetriever.default_rrf_k,
+    ) -> List[List[Document]]:
+        shards, shard_filters = self._route(filters)
+        if not queries or not shards:
+            return [[] for _ in queries]
+
+        self.query_cache.get_or_compute_many(queries, self.embedding.embed_documents)
+
+        def search(shard: AxrivRetriever):
+            return shard.hybrid_hits_many(queries, k, shard_filters)
+
+        per_shard = list(self._executor.map(search, shards))
+        return [
+            self._gather(
+                shards,
+                [(dense_many[qi], bm25_many[qi]) for dense_many, bm25_many in per_shard],
+                k, w_dense, w_bm25, fusion, rrf_k,
+            )
+            for qi in range(len(queries))
+        ]
@@ -0,0 +1,530 @@
+import os
+import time
+import pickle
+from typing import List, Tuple
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from langchain_chroma import Chroma
+
+from core.rag.DocStore import DocStore
+
+
+class VectorBackend:
+    """
+    dense_search 가 사용하는 벡터 저장소 인터페이스.
+
+    벡터는 모두 정규화된 임베딩이라고 가정하고, search 는 질의별로
+    (문서 ID, 코사인 유사도) 목록을 유사도 내림차순으로 돌려준다.
+    본문/메타데이터는 읽지 않으며, 최종 top-k 의 Document 는 호출 쪽(DocStore)에서 만든다.
+    filter 는 {"key": value} 또는 {"key": [value, ...]} 형태의 메타데이터 동등 조건이며
+    여러 키는 AND 로 묶는다.
+    """
+
+    name = "base"
+
+    def __init__(self):
+        self._search_count = 0
+        self._search_ms = 0.0
+
+    def exists(self) -> bool:
+        raise NotImplementedError
+
+    def open(self):
+        raise NotImplementedError
+
+    def upsert(self, ids: List[str], vectors, texts: List[str], metadatas: List[dict]):
+        raise NotImplementedError
+
+    def delete(self, ids: List[str]):
+        raise NotImplementedError
+
+    def update_metadata(self, ids: List[str], metadatas: List[dict]):
+        """벡터는 그대로 두고 메타데이터만 교체"""
+        raise NotImplementedError
+
+    def persist(self):
+        """버퍼링된 변경 사항을 디스크에 반영 (필요한 백엔드만 구현)"""
+
+    def get_ids(self) -> List[str]:
+        raise NotImplementedError
+
+    def get_all(self) -> Tuple[List[str], List[str], List[dict]]:
+        """(ids, texts, metadatas)"""
+        raise NotImplementedError
+
+    def search(
+        self, vectors: np.ndarray, k: int, filter: dict | None = None, **kwargs
+    ) -> List[List[Tuple[str, float]]]:
+        raise NotImplementedError
+
+    def _record_search(self, n_queries: int, start: float):
+        self._search_count += n_queries
+        self._search_ms += (time.perf_counter() - start) * 1000
+
+    def avg_search_ms(self) -> float:
+        return round(self._search_ms / self._search_count, 3) if self._search_count else 0.0
+
+    def reset_stats(self):
+        """검색 지연 누적값 초기화 (검색 방식별로 따로 측정할 때)"""
+        self._search_count = 0
+        self._search_ms = 0.0
+
+    def stats(self) -> dict:
+        return {
+            "backend": self.name,
+            "docs": len(self.get_ids()),
+            "avg_search_ms": self.avg_search_ms(),
+        }
+
+
+class ChromaBackend(VectorBackend):
+    name = "chroma"
+
+    def __init__(self, persist_dir: str, collection_name: str, embedding: Embeddings):
+        super().__init__()
+        self.persist_dir = persist_dir
+        self.collection_name = collection_name
+        self.embedding = embedding
+        self.db = None
+
+    def exists(self) -> bool:
+        return os.path.exists(self.persist_dir)
+
+    def open(self):
+        self.db = Chroma(
+            collection_name=self.collection_name,
+            embedding_function=self.embedding,
+            persist_directory=self.persist_dir,
+        )
+
+    def upsert(self, ids, vectors, texts, metadatas):
+        self.db._collection.upsert(
+            ids=list(ids),
+            embeddings=[list(map(float, v)) for v in vectors],
+            documents=list(texts),
+            metadatas=list(metadatas),
+        )
+
+    def delete(self, ids):
+        if ids:
+            self.db.delete(ids=list(ids))
+
+    def update_metadata(self, ids, metadatas):
+        if not ids:
+            return
+        # Chroma update 는 기존 메타데이터에 병합되므로, 새 메타데이터에 없는 키는 None 으로 지운다
+        current = self.db._collection.get(ids=list(ids), include=["metadatas"])
+        old_keys = {doc_id: set(meta or {}) for doc_id, meta in zip(current["ids"], current["metadatas"])}
+        replaced = [
+            {**{key: None for key in old_keys.get(doc_id, set()) - set(meta or {})}, **(meta or {})}
+            for doc_id, meta in zip(ids, metadatas)
+        ]
+        self.db._collection.update(ids=list(ids), metadatas=replaced)
+
+    def get_ids(self):
+        return self.db.get(include=[])["ids"]
+
+    def get_all(self):
+        raw = self.db.get(include=["metadatas", "documents"])
+        return raw["ids"], raw["documents"], [m or {} for m in raw["metadatas"]]
+
+    def _distance_to_similarity(self, distance: float) -> float:
+        # 정규화 벡터 기준: l2(제곱) = 2 - 2cos, cosine/ip = 1 - cos
+        space = (self.db._collection.metadata or {}).get("hnsw:space", "l2")
+        if space == "l2":
+            return 1.0 - distance / 2.0
+        return 1.0 - distance
+
+    @staticmethod
+    def _where(filter: dict | None) -> dict | None:
+        # Chroma where 문법: 리스트 값은 $in, 조건이 여러 개면 $and 로 묶어야 한다
+        if not filter:
+            return None
+        clauses = [
+            {key: {"$in": list(value)}} if isinstance(value, (list, tuple, set)) else {key: value}
+            for key, value in filter.items()
+        ]
+        return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+    def search(self, vectors, k, filter=None, **kwargs):
+        start = time.perf_counter()
+        raw = self.db._collection.query(
+            query_embeddings=[list(map(float, v)) for v in vectors],
+            n_results=k,
+            where=self._where(filter),
+            include=["distances"],
+            **kwargs,
+        )
+        results = [
+            [(doc_id, self._distance_to_similarity(dist)) for doc_id, dist in zip(ids, dists)]
+            for ids, dists in zip(raw["ids"], raw["distances"])
+        ]
+        self._record_search(len(results), start)
+        return results
+
+
+class FaissBackend(VectorBackend):
+    """
+    FAISS 백엔드 (Flat / HNSW / IVF, 내적 = 코사인 유사도).
+
+    index.faiss 는 memory-mapped 로 열어서 같은 호스트의 여러 워커가
+    페이지 캐시를 공유하도록 한다 (Flat / SQ 코드는 IO_FLAG_MMAP_IFC, IVF 역색인은 IO_FLAG_MMAP).
+    HNSW 는 벡터 코드만 매핑되고 그래프(이웃 목록)는 프로세스마다 힙에 올라간다.
+    원본 벡터(vectors.npy)와 문서(docs/, DocStore)도 memory-mapped 로 옆에 저장하고,
+    store.pkl 에는 인덱스 설정만 둔다.
+    변경(upsert/delete)은 버퍼링했다가 persist() 에서 인덱스를 한 번에 다시 만든다.
+
+    quantization("int8" / "binary") 또는 truncate_dim 을 주면 1차 검색은 압축 벡터로 하고,
+    상위 k * rescore_factor 후보를 원본 float32 벡터로 정확히 재채점한다.
+    """
+
+    name = "faiss"
+    INDEX_TYPES = ("flat", "hnsw", "ivf")
+    QUANTIZATIONS = (None, "int8", "binary")
+
+    def __init__(
+        self,
+        store_dir: str,
+        index_type: str = "flat",
+        hnsw_m: int = 32,
+        hnsw_ef_search: int = 128,
+        ivf_nlist: int = 1024,
+        ivf_nprobe: int = 16,
+        quantization: str | None = None,
+        truncate_dim: int | None = None,
+        rescore_factor: int = 4,
+    ):
+        if index_type not in self.INDEX_TYPES:
+            raise ValueError(f"지원하지 않는 FAISS 인덱스 타입: {index_type}")
+        if quantization not in self.QUANTIZATIONS:
+            raise ValueError(f"지원하지 않는 양자화 방식: {quantization}")
+        if quantization == "binary" and truncate_dim and truncate_dim % 8:
+            raise ValueError("binary 양자화의 truncate_dim 은 8의 배수여야 합니다")
+        super().__init__()
+        self.store_dir = store_dir
+        self.index_type = index_type
+        self.hnsw_m = hnsw_m
+        self.hnsw_ef_search = hnsw_ef_search
+        self.ivf_nlist = ivf_nlist
+        self.ivf_nprobe = ivf_nprobe
+        self.quantization = quantization
+        self.truncate_dim = truncate_dim
+        self.rescore_factor = rescore_factor
+
+        self.index = None
+        self.vectors = None
+        self.docs = DocStore(self.docstore_path)
+
+        self._pending = {}
+        self._deleted = set()
+        # 행 번호 -> 새 메타데이터 (persist 때 DocStore 를 다시 만들면서 반영)
+        self._metadata_updates = {}
+
+    @property
+    def index_path(self):
+        return os.path.join(self.store_dir, "index.faiss")
+
+    @property
+    def vectors_path(self):
+        return os.path.join(self.store_dir, "vectors.npy")
+
+    @property
+    def store_path(self):
+        return os.path.join(self.store_dir, "store.pkl")
+
+    @property
+    def docstore_path(self):
+        return os.path.join(self.store_dir, "docs")
+
+    @property
+    def rescoring(self) -> bool:
+        return self.quantization is not None or self.truncate_dim is not None
+
+    def _index_config(self) -> dict:
+        return {
+            "index_type": self.index_type,
+            "hnsw_m": self.hnsw_m,
+            "ivf_nlist": self.ivf_nlist,
+            "quantization": self.quantization,
+            "truncate_dim": self.truncate_dim,
+        }
+
+    def exists(self) -> bool:
+        return os.path.exists(self.index_path) and os.path.exists(self.store_path)
+
+    def open(self):
+        import faiss
+
+        os.makedirs(self.store_dir, exist_ok=True)
+        if not self.exists():
+            return
+
+        with open(self.store_path, "rb") as f:
+            state = pickle.load(f)
+        if "texts" in state:
+            # 이전 포맷(store.pkl 에 문서까지 저장) → DocStore 로 옮기고 store.pkl 은 설정만 남김
+            print("FAISS 문서를 DocStore 로 이전:", self.docstore_path)
+            DocStore.build(self.docstore_path, state["ids"], state["texts"], state["metadatas"])
+            state = {"index_config": state.get("index_config")}
+            self._write_store(state)
+        self.docs = DocStore.load(self.docstore_path) or DocStore(self.docstore_path)
+
+        self.vectors = np.load(self.vectors_path, mmap_mode="r")
+
+        # 인덱스 설정(타입/양자화/차원 축소)이 바뀌었으면 저장된 원본 벡터로 인덱스만 다시 생성
+        if state.get("index_config") != self._index_config():
+            print("FAISS 인덱스 설정 변경 → 인덱스 재생성:", self._index_config())
+            self._write_index(np.asarray(self.vectors, dtype=np.float32))
+            state["index_config"] = self._index_config()
+            self._write_store(state)
+
+        # IO_FLAG_MMAP 은 IVF 역색인만 매핑하고, Flat / SQ 코드 배열은 IO_FLAG_MMAP_IFC 로만 매핑된다
+        if self.index_type == "ivf":
+            flags = faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY
+        else:
+            flags = faiss.IO_FLAG_MMAP_IFC | faiss.IO_FLAG_READ_ONLY
+        if self.quantization == "binary":
+            self.index = faiss.read_index_binary(self.index_path, flags)
+        else:
+            self.index = faiss.read_index(self.index_path, flags)
+
+    def upsert(self, ids, vectors, texts, metadatas):
+        vectors = np.asarray(vectors, dtype=np.float32)
+        for doc_id, vec, text, meta in zip(ids, vectors, texts, metadatas):
+            self._pending[doc_id] = (vec, text, dict(meta or {}))
+            self._deleted.discard(doc_id)
+
+    def delete(self, ids):
+        for doc_id in ids:
+            self._pending.pop(doc_id, None)
+            self._deleted.add(doc_id)
+
+    def update_metadata(self, ids, metadatas):
+        # 벡터/인덱스는 건드리지 않고 persist 때 DocStore 만 다시 쓴다
+        rows = self.docs.rows_of(list(ids))
+        for doc_id, row, meta in zip(ids, rows, metadatas):
+            if doc_id in self._pending:
+                vec, text, _ = self._pending[doc_id]
+                self._pending[doc_id] = (vec, text, dict(meta or {}))
+            elif row >= 0:
+                self._metadata_updates[int(row)] = dict(meta or {})
+
+    # ——— 1차 검색용 압축 표현 ———
+    def _first_pass_vectors(self, vectors: np.ndarray) -> np.ndarray:
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        if self.truncate_dim:
+            # 앞쪽 차원만 사용하고 다시 정규화 (코사인 유지)
+            vectors = vectors[:, : self.truncate_dim]
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            vectors = np.ascontiguousarray(vectors / np.maximum(norms, 1e-12))
+        if self.quantization == "binary":
+            return np.packbits(vectors > 0, axis=1)
+        return vectors
+
+    def _build_index(self, vectors: np.ndarray):
+        import faiss
+
+        codes = self._first_pass_vectors(vectors)
+        if self.quantization == "binary":
+            dim = codes.shape[1] * 8
+            if self.index_type == "flat":
+                index = faiss.IndexBinaryFlat(dim)
+            elif self.index_type == "hnsw":
+                index = faiss.IndexBinaryHNSW(dim, self.hnsw_m)
+            else:
+                nlist = max(1, min(self.ivf_nlist, int(np.sqrt(len(codes)))))
+                index = faiss.IndexBinaryIVF(faiss.IndexBinaryFlat(dim), dim, nlist)
+                index.train(codes)
+            index.add(codes)
+            return index
+
+        dim = codes.shape[1]
+        sq = faiss.ScalarQuantizer.QT_8bit
+        ip = faiss.METRIC_INNER_PRODUCT
+        if self.index_type == "flat":
+            if self.quantization == "int8":
+                index = faiss.IndexScalarQuantizer(dim, sq, ip)
+                index.train(codes)
+            else:
+                index = faiss.IndexFlatIP(dim)
+        elif self.index_type == "hnsw":
+            if self.quantization == "int8":
+                index = faiss.IndexHNSWSQ(dim, sq, self.hnsw_m, ip)
+                index.train(codes)
+            else:
+                index = faiss.IndexHNSWFlat(dim, self.hnsw_m, ip)
+        else:
+            # 학습 데이터보다 클러스터가 많을 수 없으므로 코퍼스 크기에 맞춰 줄임
+            nlist = max(1, min(self.ivf_nlist, int(np.sqrt(len(codes)))))
+            quantizer = faiss.IndexFlatIP(dim)
+            if self.quantization == "int8":
+                index = faiss.IndexIVFScalarQuantizer(quantizer, dim, nlist, sq, ip)
+            else:
+                index = faiss.IndexIVFFlat(quantizer, dim, nlist, ip)
+            index.train(codes)
+        index.add(codes)
+        return index
+
+    def _write_index(self, vectors: np.ndarray):
+        import faiss
+
+        if not len(vectors):
+            if os.path.exists(self.index_path):
+                os.remove(self.index_path)
+            return
+        index = self._build_index(vectors)
+        if self.quantization == "binary":
+            faiss.write_index_binary(index, f"{self.index_path}.tmp")
+        else:
+            faiss.write_index(index, f"{self.index_path}.tmp")
+        os.replace(f"{self.index_path}.tmp", self.index_path)
+
+    def _write_store(self, state: dict):
+        with open(f"{self.store_path}.tmp", "wb") as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(f"{self.store_path}.tmp", self.store_path)
+
+    def _metadata(self, row: int) -> dict:
+        meta = self._metadata_updates.get(row)
+        return dict(meta) if meta is not None else self.docs.metadata(row)
+
+    def persist(self):
+        if not self._pending and not self._deleted:
+            if self._metadata_updates:
+                rows = range(len(self.docs))
+                self.docs = DocStore.build(
+                    self.docstore_path,
+                    [self.docs.id(i) for i in rows],
+                    [self.docs.text(i) for i in rows],
+                    [self._metadata(i) for i in rows],
+                )
+                self._metadata_updates = {}
+            return
+
+        changed = self._deleted | set(self._pending)
+        keep = [i for i in range(len(self.docs)) if self.docs.id(i) not in changed]
+
+        ids = [self.docs.id(i) for i in keep] + list(self._pending)
+        texts = [self.docs.text(i) for i in keep] + [t for _, t, _ in self._pending.values()]
+        metadatas = [self._metadata(i) for i in keep] + [m for _, _, m in self._pending.values()]
+
+        parts = []
+        if self.vectors is not None and keep:
+            parts.append(np.asarray(self.vectors[keep], dtype=np.float32))
+        if self._pending:
+            parts.append(np.stack([v for v, _, _ in self._pending.values()]))
+        vectors = np.concatenate(parts) if parts else np.zeros((0, 0), dtype=np.float32)
+
+        os.makedirs(self.store_dir, exist_ok=True)
+        # 기존 memmap 을 닫은 뒤 임시 파일 → 교체
+        self.index = None
+        self.vectors = None
+        np.save(f"{self.vectors_path}.tmp.npy", vectors)
+        os.replace(f"{self.vectors_path}.tmp.npy", self.vectors_path)
+        self._write_index(vectors)
+        DocStore.build(self.docstore_path, ids, texts, metadatas)
+        self._write_store({"index_config": self._index_config()})
+
+        self._pending = {}
+        self._deleted = set()
+        self._metadata_updates = {}
+        self.docs = DocStore(self.docstore_path)
+        self.open()
+        print("FAISS 인덱스 저장:", self.stats())
+
+    def get_ids(self):
+        return self.docs.ids
+
+    def get_all(self):
+        rows = range(len(self.docs))
+        return (
+            self.docs.ids,
+            [self.docs.text(i) for i in rows],
+            [self._metadata(i) for i in rows],
+        )
+
+    def _allowed_rows(self, filter: dict) -> np.ndarray:
+        # ChromaBackend._where 와 같은 의미 (값이 리스트면 그중 하나와 일치)
+        allowed = None
+        for key, value in filter.items():
+            values = value if isinstance(value, (list, tuple, set)) else [value]
+            by_value = self.docs.rows_by_value(key)
+            parts = [by_value[v] for v in values if v in by_value]
+            rows = np.unique(np.concatenate(parts)) if parts else np.zeros(0, dtype=np.int64)
+            allowed = rows if allowed is None else np.intersect1d(allowed, rows)
+        return allowed if allowed is not None else np.arange(len(self.docs), dtype=np.int64)
+
+    def _search_params(self, filter: dict | None):
+        import faiss
+
+        sel = None
+        if filter:
+            sel = faiss.IDSelectorBatch(self._allowed_rows(filter))
+        if self.index_type == "hnsw":
+            return faiss.SearchParametersHNSW(sel=sel, efSearch=self.hnsw_ef_search)
+        if self.index_type == "ivf":
+            return faiss.SearchParametersIVF(sel=sel, nprobe=self.ivf_nprobe)
+        return faiss.SearchParameters(sel=sel) if sel is not None else None
+
+    def _candidate_rows(self, queries: np.ndarray, n_candidates: int, filter: dict | None):
+        if self.quantization == "binary":
+            if filter:
+                # 필터 결과는 보통 작으므로 허용된 행 전체를 후보로 두고 재채점
+                allowed = self._allowed_rows(filter)
+                return np.tile(allowed, (len(queries), 1)), None
+            if self.index_type == "hnsw":
+                self.index.hnsw.efSearch = max(self.hnsw_ef_search, n_candidates)
+            elif self.index_type == "ivf":
+                self.index.nprobe = self.ivf_nprobe
+            scores, rows = self.index.search(self._first_pass_vectors(queries), n_candidates)
+            return rows, None
+
+        scores, rows = self.index.search(
+            self._first_pass_vectors(queries), n_candidates, params=self._search_params(filter)
+        )
+        return rows, scores
+
+    def search(self, vectors, k, filter=None, **kwargs):
+        queries = np.ascontiguousarray(np.atleast_2d(vectors), dtype=np.float32)
+        if self.index is None or not len(self.docs):
+            return [[] for _ in range(len(queries))]
+
+        start = time.perf_counter()
+        n_candidates = min(k * self.rescore_factor if self.rescoring else k, len(self.docs))
+        rows, scores = self._candidate_rows(queries, n_candidates, filter)
+
+        results = []
+        for qi, row_ids in enumerate(rows):
+            if self.rescoring:
+                # 후보만 원본 float32 벡터로 정확히 재채점
+                cand = np.unique(row_ids[row_ids >= 0])
+                exact = np.asarray(self.vectors[cand], dtype=np.float32) @ queries[qi]
+                order = np.argsort(-exact)[:k]
+                hits = [(int(cand[i]), float(exact[i])) for i in order]
+            else:
+                hits = [
+                    (int(row), float(score))
+                    for row, score in zip(row_ids, scores[qi])
+                    if row >= 0
+                ]
+            results.append([(self.docs.id(row), score) for row, score in hits])
+
+        self._record_search(len(queries), start)
+        return results
+
+    def stats(self) -> dict:
+        """모드별 문서당 메모리와 평균 검색 지연 (1차 검색 + 재채점 포함)"""
+        n_docs = len(self.docs)
+        full_dim = self.vectors.shape[1] if self.vectors is not None and self.vectors.ndim == 2 else 0
+        index_bytes = os.path.getsize(self.index_path) if os.path.exists(self.index_path) else 0
+        return {
+            "backend": self.name,
+            "index_type": self.index_type,
+            "quantization": self.quantization or "float32",
+            "dim": self.truncate_dim or full_dim,
+            "docs": n_docs,
+            "index_bytes_per_doc": round(index_bytes / n_docs, 1) if n_docs else 0.0,
+            "full_vector_bytes_per_doc": full_dim * 4,
+            "avg_search_ms": self.avg_search_ms(),
+        }
@@ -0,0 +1,250 @@
+"""
+PDF 코퍼스 일괄 파싱.
+
+- PDF 들을 워커 프로세스들에 나눠서 파싱 (워커마다 DocumentConverter 1개를 한 번만 생성)
+- 파일별 제한 시간을 넘기면 그 워커만 종료하고 새 워커로 교체
+- 특정 파일에서 워커가 죽어도(segfault 등) 그 파일만 실패로 기록하고 계속 진행
+- 진행률 / 처리량(files/s, pages/s)을 출력하고, 결과는 PDF 하나당 한 줄 JSONL 로 저장
+- 파싱 결과 디스크 캐시(labs.parse_cache)를 쓰므로 바뀌지 않은 PDF 는 다시 파싱하지 않음
+
+document_parser 가 BLAS/OMP 스레드를 1개로 고정하므로 워커 수만큼 코어를 쓴다.
+
+사용 예시 (src 디렉터리에서):
+    python -m labs.batch_parse data/agent data/rag --workers 8 --output parsed.jsonl
+    python -m labs.batch_parse data/agent --method fallback --timeout 300 --output agent.jsonl
+"""
+import os
+import json
+import time
+import argparse
+import multiprocessing as mp
+from collections import deque
+from multiprocessing.connection import wait
+from typing import List
+
+PARSE_METHODS = ("adaptive", "fallback")
+
+
+def _worker_main(conn, method: str, use_cache: bool = True):
+    """워커 프로세스: converter 를 한 번 만들고 ready 를 알린 뒤 경로를 받아 파싱"""
+    from labs import document_parser
+
+    parse_fn = {
+        "adaptive": document_parser.parse_with_docling,
+        "fallback": document_parser.parse_docling_with_fallback,
+    }[method]
+
+    def parse(pdf_path):
+        return parse_fn(pdf_path, use_cache=use_cache)
+
+    document_parser.get_docling()
+    conn.send(("ready",))
+
+    while True:
+        try:
+            pdf_path = conn.recv()
+        except EOFError:
+            break
+        if pdf_path is None:
+            break
+        start = time.perf_counter()
+        try:
+            docs = parse(pdf_path)
+            conn.send(("done", pdf_path, "ok", docs, None, time.perf_counter() - start))
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            conn.send(("done", pdf_path, "error", [], error, time.perf_counter() - start))
+
+
+class _Worker:
+    def __init__(self, ctx, method: str, use_cache: bool = True):
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(
+            target=_worker_main, args=(child_conn, method, use_cache), daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+        self.ready = False
+        self.task = None
+        self.started = None
+
+    def submit(self, pdf_path: str):
+        self.conn.send(pdf_path)
+        self.task = pdf_path
+        self.started = time.monotonic()
+
+    def kill(self):
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+    def stop(self):
+        try:
+            self.conn.send(None)
+        except OSError:
+            pass
+        self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+
+def list_pdfs(paths: List[str]) -> List[str]:
+    """파일 / 디렉터리 목록 → 정렬된 PDF 경로 (디렉터리는 하위까지 탐색)"""
+    pdfs = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, files in os.walk(path):
+                pdfs.extend(os.path.join(root, f) for f in files if f.lower().endswith(".pdf"))
+        elif path.lower().endswith(".pdf"):
+            pdfs.append(path)
+    return sorted(set(pdfs))
+
+
+def _page_count(docs: List[dict]) -> int:
+    return len({d.get("metadata", {}).get("page") for d in docs} - {None})
+
+
+def batch_parse(
+    pdfs: List[str],
+    output_path: str,
+    workers: int = max(1, (os.cpu_count() or 2) - 1),
+    method: str = "adaptive",
+    timeout: float = 600.0,
+    max_init_failures: int | None = None,
+    use_cache: bool = True,
+) -> dict:
+    """
+    pdfs 를 workers 개 프로세스로 파싱해서 output_path(JSONL)에 파일별 결과를 쓴다.
+    각 줄: {"pdf", "status": ok|error|timeout|crashed, "seconds", "pages", "docs", "error"}
+    """
+    if method not in PARSE_METHODS:
+        raise ValueError(f"지원하지 않는 파싱 방식: {method}")
+    workers = max(1, min(workers, len(pdfs))) if pdfs else 0
+    max_init_failures = max_init_failures if max_init_failures is not None else workers * 2
+
+    # 부모 프로세스에 torch 등이 올라와 있을 수 있으므로 spawn 사용
+    ctx = mp.get_context("spawn")
+    pending = deque(pdfs)
+    pool = [_Worker(ctx, method, use_cache) for _ in range(workers)]
+    stats = {"ok": 0, "error": 0, "timeout": 0, "crashed": 0}
+    pages = 0
+    init_failures = 0
+    start = time.perf_counter()
+
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    with open(output_path, "w", encoding="utf-8") as out:
+
+        def record(pdf_path, status, docs, error, seconds):
+            nonlocal pages
+            stats[status] += 1
+            n_pages = _page_count(docs)
+            pages += n_pages
+            out.write(json.dumps({
+                "pdf": pdf_path,
+                "status": status,
+                "seconds": round(seconds, 3),
+                "pages": n_pages,
+                "docs": docs,
+                "error": error,
+            }, ensure_ascii=False) + "\n")
+            out.flush()
+
+            done = sum(stats.values())
+            elapsed = time.perf_counter() - start
+            print(
+                f"[{done}/{len(pdfs)}] {status} {os.path.basename(pdf_path)} ({seconds:.1f}s) "
+                f"- {done / elapsed:.2f} files/s, {pages / elapsed:.1f} pages/s"
+                + (f" ({error})" if error else "")
+            )
+
+        def replace(worker):
+            nonlocal init_failures
+            if not worker.ready:
+                init_failures += 1
+                if init_failures > max_init_failures:
+                    raise RuntimeError("파싱 워커 초기화가 반복해서 실패했습니다 (docling 설치 / 모델 확인)")
+            pool[pool.index(worker)] = _Worker(ctx, method, use_cache)
+
+        try:
+            while pending or any(w.task for w in pool):
+                for w in pool:
+                    if w.ready and w.task is None and pending:
+                        w.submit(pending.popleft())
+
+                now = time.monotonic()
+                deadlines = [w.started + timeout - now for w in pool if w.task]
+                wait_timeout = max(0.0, min(deadlines)) if deadlines else None
+                wait([w.conn for w in pool] + [w.process.sentinel for w in pool], wait_timeout)
+
+                for w in list(pool):
+                    try:
+                        message = w.conn.recv() if w.conn.poll() else None
+                    except (EOFError, OSError):
+                        message = None
+
+                    if message and message[0] == "ready":
+                        w.ready = True
+                    elif message and message[0] == "done":
+                        _, pdf_path, status, docs, error, seconds = message
+                        w.task = None
+                        record(pdf_path, status, docs, error, seconds)
+                    elif not w.process.is_alive():
+                        # 파싱 중 프로세스가 죽음 → 해당 파일만 실패 처리하고 워커 교체
+                        if w.task:
+                            seconds = time.monotonic() - w.started
+                            record(w.task, "crashed", [], f"exit code {w.process.exitcode}", seconds)
+                        w.kill()
+                        replace(w)
+                    elif w.task and time.monotonic() - w.started > timeout:
+                        seconds = time.monotonic() - w.started
+                        w.kill()
+                        record(w.task, "timeout", [], f"{timeout:.0f}s 초과", seconds)
+                        # 워커는 이미 초기화된 상태였으므로 초기화 실패로 세지 않음
+                        pool[pool.index(w)] = _Worker(ctx, method, use_cache)
+        finally:
+            for w in pool:
+                if w.process.is_alive():
+                    w.stop()
+
+    elapsed = time.perf_counter() - start
+    summary = {
+        "files": len(pdfs),
+        **stats,
+        "pages": pages,
+        "workers": workers,
+        "seconds": round(elapsed, 2),
+        "files_per_sec": round(len(pdfs) / elapsed, 3) if elapsed else 0.0,
+        "pages_per_sec": round(pages / elapsed, 2) if elapsed else 0.0,
+        "output": output_path,
+    }
+    print("일괄 파싱 완료:", summary)
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PDF 코퍼스 일괄 파싱 (프로세스 풀)")
+    parser.add_argument("paths", nargs="+", help="PDF 파일 또는 디렉터리")
+    parser.add_argument("--output", required=True, help="결과 JSONL 경로")
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) - 1))
+    parser.add_argument("--method", choices=PARSE_METHODS, default="adaptive",
+                        help="adaptive: parse_with_docling, fallback: parse_docling_with_fallback")
+    parser.add_argument("--timeout", type=float, default=600.0, help="파일당 제한 시간(초)")
+    parser.add_argument("--no-cache", action="store_true", help="파싱 결과 디스크 캐시를 쓰지 않음")
+    args = parser.parse_args()
+
+    pdfs = list_pdfs(args.paths)
+    print(f"PDF {len(pdfs)}개, 워커 {args.workers}개")
+    batch_parse(
+        pdfs,
+        args.output,
+        workers=args.workers,
+        method=args.method,
+        timeout=args.timeout,
+        use_cache=not args.no_cache,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,6 @@
 import numpy as np
 import re
-from typing import List, Dict, Any
+from typing import Any, Callable, Dict, Iterable, Iterator, List
 from sklearn.metrics.pairwise import cosine_similarity
 
 def split_into_sentences(text: str) -> List[str]:
@@ -60,3 +60,29 @@ def minmax_chunking_process(sentences, embeddings, fixed_threshold=0.6, c=0.9, i
     paragraphs.append(current_paragraph)
     return paragraphs
 
+
+
+def iter_chunks(docs: Iterable[Dict[str, Any]], embed_fn: Callable[[List[str]], Any], **chunking_kwargs) -> Iterator[Dict[str, Any]]:
+    """
+    파싱 결과 문서(dict) 스트림을 받아 문서(페이지)마다 바로 문장 분할 → 임베딩 → minmax 청킹 후 청크를 내보냅니다.
+    iter_parse_with_docling 과 연결하면 파싱이 끝나기 전에 앞 페이지부터 청킹/임베딩이 진행됩니다.
+
+    매개변수 (Args):
+    - docs (iterable of dict): {"page_content", "metadata"} 형식 문서 스트림.
+    - embed_fn (callable): 문장 리스트 → 임베딩 배열 (예: embeddings.embed_documents).
+    - chunking_kwargs: minmax_chunking_process 에 넘길 인자 (fixed_threshold, c, init_constant).
+
+    반환값 (Returns):
+    - iterator of dict: {"page_content": 단락 텍스트, "metadata": 원본 메타데이터 + chunk 번호}.
+    """
+    for doc in docs:
+        sentences = split_into_sentences(doc.get("page_content") or "")
+        if not sentences:
+            continue
+        embeddings = np.asarray(embed_fn(sentences))
+        paragraphs = minmax_chunking_process(sentences, embeddings, **chunking_kwargs)
+        for i, paragraph in enumerate(paragraphs):
+            yield {
+                "page_content": " ".join(paragraph),
+                "metadata": {**doc.get("metadata", {}), "chunk": i},
+            }
@@ -1,5 +1,13 @@
-from docling.document_converter import DocumentConverter
+from docling.datamodel.base_models import InputFormat
+from docling.datamodel.pipeline_options import PdfPipelineOptions
+from docling.document_converter import DocumentConverter, PdfFormatOption
 import fitz, pdfplumber, layoutparser as lp, cv2, os
+import threading
+import importlib.metadata
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from labs.parse_cache import ParseCache
 
 import numpy as np
 os.environ["DOC_ACCELERATOR_DEVICE"] = "cpu"
@@ -10,29 +18,119 @@ os.environ["OPENBLAS_NUM_THREADS"] = "1"
 os.environ["MKL_NUM_THREADS"] = "1"
 os.environ["DOCLING_PICTURE_DESCRIPTIONS"] = "" 
 
+# ——— 0️⃣ PDF 세션 (백엔드별로 파일을 한 번만 열기) ———
+class PdfSession:
+    """
+    PDF 하나를 fitz / pdfplumber / PyPDF2 로 각각 처음 필요할 때 한 번만 열고 페이지 객체를 캐시.
+    파싱 함수들에 session 으로 넘기면 함수/페이지마다 파일을 다시 열고 xref 를 파싱하지 않는다.
+    """
+
+    def __init__(self, pdf_path: str):
+        self.pdf_path = pdf_path
+        self.source = os.path.basename(pdf_path)
+        self._fitz_doc = None
+        self._plumber_doc = None
+        self._pypdf_reader = None
+        self._fitz_pages = {}
+        self._plumber_pages = {}
+
+    @property
+    def fitz_doc(self):
+        if self._fitz_doc is None:
+            self._fitz_doc = fitz.open(self.pdf_path)
+        return self._fitz_doc
+
+    @property
+    def plumber_doc(self):
+        if self._plumber_doc is None:
+            self._plumber_doc = pdfplumber.open(self.pdf_path)
+        return self._plumber_doc
+
+    @property
+    def pypdf_reader(self):
+        if self._pypdf_reader is None:
+            from PyPDF2 import PdfReader
+            self._pypdf_reader = PdfReader(self.pdf_path)
+        return self._pypdf_reader
+
+    @property
+    def page_count(self) -> int:
+        return len(self.fitz_doc)
+
+    def fitz_page(self, page_idx: int):
+        page = self._fitz_pages.get(page_idx)
+        if page is None:
+            page = self._fitz_pages[page_idx] = self.fitz_doc[page_idx]
+        return page
+
+    def plumber_page(self, page_idx: int):
+        page = self._plumber_pages.get(page_idx)
+        if page is None:
+            page = self._plumber_pages[page_idx] = self.plumber_doc.pages[page_idx]
+        return page
+
+    def release_page(self, page_idx: int):
+        """캐시된 페이지 객체를 버림 (pdfplumber 페이지의 문자/객체 캐시 포함)"""
+        self._fitz_pages.pop(page_idx, None)
+        page = self._plumber_pages.pop(page_idx, None)
+        if page is not None and hasattr(page, "close"):
+            page.close()
+
+    def close(self):
+        self._fitz_pages.clear()
+        self._plumber_pages.clear()
+        if self._fitz_doc is not None:
+            self._fitz_doc.close()
+            self._fitz_doc = None
+        if self._plumber_doc is not None:
+            self._plumber_doc.close()
+            self._plumber_doc = None
+        self._pypdf_reader = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+@contextmanager
+def open_pdf_session(pdf_path: str, session: PdfSession | None = None):
+    """session 이 있으면 그대로 쓰고(닫지 않음), 없으면 새로 열고 끝나면 닫는다"""
+    if session is not None:
+        yield session
+        return
+    with PdfSession(pdf_path) as session:
+        yield session
+
+
 # ——— 1️⃣ 텍스트 레이어 확인 ———
-def has_text_layer(pdf_path: str) -> bool:
-    from PyPDF2 import PdfReader
-    reader = PdfReader(pdf_path)
-    for pg in reader.pages[:3]:
-        txt = pg.extract_text()
-        if txt and len(txt.strip()) > 50:
-            return True
+def has_text_layer(pdf_path: str, session: PdfSession | None = None) -> bool:
+    with open_pdf_session(pdf_path, session) as s:
+        for pg in s.pypdf_reader.pages[:3]:
+            txt = pg.extract_text()
+            if txt and len(txt.strip()) > 50:
+                return True
     return False
 
 # ——— 2️⃣ 좌표 기반 텍스트 정렬 (PyMuPDF) ———
-def extract_text_mupdf_clean_strict(pdf_path: str):
+def extract_text_mupdf_clean_strict(pdf_path: str, session: PdfSession | None = None):
     """
     - 페이지 상/하/모서리/작은 폰트 제거
     - '붙어버린 단어'를 x-좌표 간격 기반으로 스페이스 복원
     - 두단 문서는 왼쪽 칼럼 전체 → 오른쪽 칼럼 전체 순서 유지 (A1 A2 A3 B1 B2 B3)
     """
-    import fitz, numpy as np, re
+    with open_pdf_session(pdf_path, session) as s:
+        return _extract_text_mupdf_clean_strict(s)
+
+
+def _extract_text_mupdf_clean_strict(session: PdfSession):
+    import numpy as np, re
 
-    doc = fitz.open(pdf_path)
     all_pages = []
 
-    for page in doc:
+    for page_idx in range(session.page_count):
+        page = session.fitz_page(page_idx)
         page_w, page_h = page.rect.width, page.rect.height
         data = page.get_text("dict")
         if not data or "blocks" not in data:
@@ -212,11 +310,12 @@ def extract_text_mupdf_clean_strict(pdf_path: str):
 #     return "\n\n".join(pages)
 
 # ——— 3️⃣ 표 및 세밀한 줄 보정 (pdfplumber) ———
-def extract_text_pdfplumber(pdf_path: str):
+def extract_text_pdfplumber(pdf_path: str, session: PdfSession | None = None):
     all_text = []
     tables = []
-    with pdfplumber.open(pdf_path) as pdf:
-        for i, page in enumerate(pdf.pages):
+    with open_pdf_session(pdf_path, session) as s:
+        for i in range(len(s.plumber_doc.pages)):
+            page = s.plumber_page(i)
             chars = sorted(page.chars, key=lambda c: (round(c["top"], 1), c["x0"]))
             prev_y = None
             txt = ""
@@ -235,226 +334,442 @@ def extract_text_pdfplumber(pdf_path: str):
 
 
 # ——— 4️⃣ 페이지별 구조 감지 (텍스트 vs 이미지 vs 표 등) ———
-def analyze_page_type(pdf_path):
+def analyze_page_type(pdf_path, session: PdfSession | None = None):
     """페이지별로 텍스트/이미지/표 비율 분석"""
-    doc = fitz.open(pdf_path)
-    page_types = []
-    for i, page in enumerate(doc):
-        img_count = len(page.get_images())
-        text_blocks = page.get_text("blocks")
-        text_len = sum(len(b[4].strip()) for b in text_blocks if b[4].strip())
-        text_lower = (page.get_text("text") or "").lower()
-        
-        if img_count > 0 and text_len > 400:
-            ptype = "text+image"
-        elif img_count > 0 and text_len < 100:
-            ptype = "image_only"
-        elif "table" in text_lower or "표" in text_lower:
-            ptype = "text+table"
-        else:
-            ptype = "text_only"
+    with open_pdf_session(pdf_path, session) as s:
+        return _analyze_page_type(s)
+
+
+def _analyze_page_type(session: PdfSession):
+    return [_page_info(session, i) for i in range(session.page_count)]
+
+
+def _page_info(session: PdfSession, i: int) -> dict:
+    page = session.fitz_page(i)
+    img_count = len(page.get_images())
+    text_blocks = page.get_text("blocks")
+    text_len = sum(len(b[4].strip()) for b in text_blocks if b[4].strip())
+    text_lower = (page.get_text("text") or "").lower()
+
+    if img_count > 0 and text_len > 400:
+        ptype = "text+image"
+    elif img_count > 0 and text_len < 100:
+        ptype = "image_only"
+    elif "table" in text_lower or "표" in text_lower:
+        ptype = "text+table"
+    else:
+        ptype = "text_only"
+
+    return {"page": i, "type": ptype, "img_count": img_count, "text_len": text_len}
+
+
+# Docling 파이프라인 옵션 (파싱 캐시 키에도 들어가므로 바꾸면 기존 캐시가 자동으로 무효화됨)
+DOCLING_PIPELINE_OPTIONS = PdfPipelineOptions()
+
+# DocumentConverter 는 무거우므로 프로세스당 처음 필요할 때 한 번만 생성 (배치 파싱 워커마다 1개)
+docling = None
+_docling_lock = threading.Lock()
+
+
+def get_docling() -> DocumentConverter:
+    global docling
+    if docling is None:
+        with _docling_lock:
+            if docling is None:
+                docling = DocumentConverter(
+                    format_options={
+                        InputFormat.PDF: PdfFormatOption(pipeline_options=DOCLING_PIPELINE_OPTIONS)
+                    }
+                )
+    return docling
+
+# ——— Docling 변환 결과 캐시 (문서당 한 번만 변환) ———
+DOCLING_CACHE_SIZE = 4
+_docling_cache = OrderedDict()
+_docling_cache_lock = threading.Lock()
 
-        page_types.append({"page": i, "type": ptype, "img_count": img_count, "text_len": text_len})
-    return page_types
 
+def _page_of(item):
+    """section / table 의 페이지 번호 (1부터). 구버전 page_number, 신버전 prov[0].page_no 모두 지원"""
+    page = getattr(item, "page_number", None)
+    if page is None:
+        prov = getattr(item, "prov", None) or []
+        page = getattr(prov[0], "page_no", None) if prov else None
+    return page
 
-docling = DocumentConverter()
-def parse_docling_only(pdf_path: str, page_numbers: list[int] | None = None):
+
+class DoclingConversion:
     """
-    최신 Docling API에서는 page_numbers 인자를 지원하지 않음.
-    따라서 전체 문서를 변환하고 이후 필요한 페이지만 필터링.
+    Docling 변환 결과 하나와 페이지별 section / table 색인.
+    원본 document 는 수정하지 않고, select() 는 같은 document 를 공유하는 부분 보기를 돌려준다.
     """
-    result = docling.convert(pdf_path)
-    doc_struct = result.document
-
-    # page_numbers가 있을 경우 — 해당 페이지 데이터만 필터링
-    if page_numbers is not None and hasattr(doc_struct, "sections"):
-        selected_sections = [
-            sec for sec in doc_struct.sections
-            if getattr(sec, "page_number", None) in page_numbers
+
+    def __init__(self, document, sections=None, tables=None):
+        self.document = document
+        if sections is None:
+            sections = getattr(document, "sections", None)
+            if sections is None:
+                # 최신 DoclingDocument 에는 sections 가 없으므로 텍스트 항목을 페이지별로 묶어서 사용
+                sections = self._sections_from_texts(document)
+        if tables is None:
+            tables = getattr(document, "tables", None) or []
+        self.sections = list(sections)
+        self.tables = list(tables)
+
+        self.sections_by_page = {}
+        for sec in self.sections:
+            self.sections_by_page.setdefault(_page_of(sec), []).append(sec)
+        self.tables_by_page = {}
+        for tbl in self.tables:
+            self.tables_by_page.setdefault(_page_of(tbl), []).append(tbl)
+
+    @staticmethod
+    def _sections_from_texts(document):
+        from types import SimpleNamespace
+
+        by_page = {}
+        for item in getattr(document, "texts", None) or []:
+            text = (getattr(item, "text", "") or "").strip()
+            if text:
+                by_page.setdefault(_page_of(item), []).append(text)
+        return [
+            SimpleNamespace(text="\n".join(texts), title=None, page_number=page)
+            for page, texts in by_page.items()
         ]
-        # 임시 구조체 흉내 — section만 교체
-        doc_struct.sections = selected_sections
 
-    return doc_struct
+    def select(self, page_numbers: list[int] | None = None) -> "DoclingConversion":
+        if page_numbers is None:
+            return self
+        return DoclingConversion(
+            self.document,
+            sections=[sec for p in page_numbers for sec in self.sections_by_page.get(p, [])],
+            tables=[tbl for p in page_numbers for tbl in self.tables_by_page.get(p, [])],
+        )
+
+
+def convert_document(pdf_path: str) -> DoclingConversion:
+    """
+    Docling 변환 (경로 + 수정 시각 + 크기 기준 LRU 캐시). 같은 PDF 의 페이지별 호출은 재변환하지 않음.
+    변환 실패도 같은 키로 캐시해서, 나머지 페이지에서는 다시 변환하지 않고 같은 예외를 낸다.
+    """
+    stat = os.stat(pdf_path)
+    key = (os.path.abspath(pdf_path), stat.st_mtime_ns, stat.st_size)
+    with _docling_cache_lock:
+        conversion = _docling_cache.get(key)
+        if conversion is not None:
+            _docling_cache.move_to_end(key)
+    if isinstance(conversion, Exception):
+        raise conversion.with_traceback(None)
+    if conversion is not None:
+        return conversion
+
+    try:
+        conversion = DoclingConversion(get_docling().convert(pdf_path).document)
+    except Exception as e:
+        conversion = e
+
+    with _docling_cache_lock:
+        _docling_cache[key] = conversion
+        while len(_docling_cache) > DOCLING_CACHE_SIZE:
+            _docling_cache.popitem(last=False)
+    if isinstance(conversion, Exception):
+        raise conversion
+    return conversion
+
+
+def parse_docling_only(pdf_path: str, page_numbers: list[int] | None = None) -> DoclingConversion:
+    """
+    최신 Docling API에서는 page_numbers 인자를 지원하지 않음.
+    따라서 문서 전체를 한 번 변환(캐시)하고, 필요한 페이지의 section / table 만 색인에서 조회.
+    """
+    return convert_document(pdf_path).select(page_numbers)
 # ——— 5️⃣ 페이지별로 파서 선택 실행 ———
-def parse_page_adaptively(pdf_path):
+def parse_page_adaptively(pdf_path, session: PdfSession | None = None):
     """페이지 단위 적응형 파싱 (빈 페이지 누락 방지)"""
-    page_summaries = analyze_page_type(pdf_path)
-    results = []
+    return list(iter_page_adaptively(pdf_path, session))
 
-    import pandas as pd
 
-    for info in page_summaries:
-        page_idx = info["page"]
-        ptype = info["type"]
-        base_meta = {"page": page_idx, "source": os.path.basename(pdf_path)}
+def iter_page_adaptively(pdf_path, session: PdfSession | None = None):
+    """
+    parse_page_adaptively 의 generator 버전.
+    페이지 하나의 파싱이 끝날 때마다 그 페이지의 문서(dict)들을 바로 내보낸다.
+    (Docling 은 문서 단위로만 변환되므로 Docling 경로의 첫 페이지에서 한 번 변환하고 이후는 색인 조회)
+    """
+    with open_pdf_session(pdf_path, session) as s:
+        for page_idx in range(s.page_count):
+            docs = _parse_page(pdf_path, s, _page_info(s, page_idx))
+            # 끝난 페이지 객체는 바로 놓아서 긴 PDF 도 페이지 하나 분량만 들고 있게 함
+            s.release_page(page_idx)
+            yield from docs
 
-        try:
-            if ptype == "text_only":
-                # ✅ Docling section이 없더라도 mupdf fallback 추가
-                doc_struct = parse_docling_only(pdf_path, page_numbers=[page_idx + 1])
-                section_added = False
-                for sec in getattr(doc_struct, "sections", []):
-                    results.append({
-                        "page_content": sec.text.strip(),
-                        "metadata": {**base_meta, "type": "text"}
-                    })
-                    section_added = True
-                if not section_added:
-                    # 🔻 특정 페이지만 추출
-                    doc = fitz.open(pdf_path)
-                    page = doc[page_idx]
-                    txt = page.get_text("text")
-                    results.append({
-                        "page_content": txt.strip(),
-                        "metadata": {**base_meta, "type": "text-fallback"}
-                    })
 
-            elif ptype == "text+table":
-                with pdfplumber.open(pdf_path) as pdf:
-                    page = pdf.pages[page_idx]
-                    text = page.extract_text() or ""
-                    tables = page.extract_tables()
-                    if tables:
-                        for tbl in tables:
-                            df = pd.DataFrame(tbl[1:], columns=tbl[0])
-                            results.append({
-                                "page_content": df.to_markdown(index=False),
-                                "metadata": {**base_meta, "type": "table"}
-                            })
-                    if text.strip():
-                        results.append({
-                            "page_content": text.strip(),
-                            "metadata": {**base_meta, "type": "text+table"}
-                        })
-                    else:
-                        # ✅ 표만 있고 텍스트 없는 경우라도 dummy 텍스트 추가
-                        results.append({
-                            "page_content": "[No text on this page]",
-                            "metadata": {**base_meta, "type": "table-only"}
-                        })
-            
-            elif ptype in ["text+image","image_only"] :
-                doc_struct = parse_docling_only(pdf_path, page_numbers=[page_idx + 1])
-                section_added = False
-                for sec in getattr(doc_struct, "sections", []):
-                    results.append({
-                        "page_content": sec.text.strip(),
-                        "metadata": {**base_meta, "type": "text"}
-                    })
-                    section_added = True
-                if not section_added:
-                    # 특정 페이지만 추출
-                    doc = fitz.open(pdf_path)
-                    page = doc[page_idx]
-                    txt = page.get_text("text")
+def _parse_page(pdf_path, session: PdfSession, info: dict) -> list:
+    results = []
+
+    import pandas as pd
+
+    page_idx = info["page"]
+    ptype = info["type"]
+    base_meta = {"page": page_idx, "source": os.path.basename(pdf_path)}
+
+    try:
+        if ptype == "text_only":
+            # ✅ Docling section이 없더라도 mupdf fallback 추가
+            converted = parse_docling_only(pdf_path, page_numbers=[page_idx + 1])
+            section_added = False
+            for sec in converted.sections:
+                results.append({
+                    "page_content": sec.text.strip(),
+                    "metadata": {**base_meta, "type": "text"}
+                })
+                section_added = True
+            if not section_added:
+                # 🔻 특정 페이지만 추출
+                txt = session.fitz_page(page_idx).get_text("text")
+                results.append({
+                    "page_content": txt.strip(),
+                    "metadata": {**base_meta, "type": "text-fallback"}
+                })
+
+        elif ptype == "text+table":
+            page = session.plumber_page(page_idx)
+            text = page.extract_text() or ""
+            tables = page.extract_tables()
+            if tables:
+                for tbl in tables:
+                    df = pd.DataFrame(tbl[1:], columns=tbl[0])
                     results.append({
-                        "page_content": txt.strip(),
-                        "metadata": {**base_meta, "type": "text-fallback"}
+                        "page_content": df.to_markdown(index=False),
+                        "metadata": {**base_meta, "type": "table"}
                     })
-        except Exception as e:
-            #  페이지별 에러 무시하고 계속 진행
-            results.append({
-                "page_content": f"[Page {page_idx} skipped due to error: {str(e)}]",
-                "metadata": {**base_meta, "type": "error"}
-            })
+            if text.strip():
+                results.append({
+                    "page_content": text.strip(),
+                    "metadata": {**base_meta, "type": "text+table"}
+                })
+            else:
+                # ✅ 표만 있고 텍스트 없는 경우라도 dummy 텍스트 추가
+                results.append({
+                    "page_content": "[No text on this page]",
+                    "metadata": {**base_meta, "type": "table-only"}
+                })
+        
+        elif ptype in ["text+image","image_only"] :
+            converted = parse_docling_only(pdf_path, page_numbers=[page_idx + 1])
+            section_added = False
+            for sec in converted.sections:
+                results.append({
+                    "page_content": sec.text.strip(),
+                    "metadata": {**base_meta, "type": "text"}
+                })
+                section_added = True
+            if not section_added:
+                # 특정 페이지만 추출
+                txt = session.fitz_page(page_idx).get_text("text")
+                results.append({
+                    "page_content": txt.strip(),
+                    "metadata": {**base_meta, "type": "text-fallback"}
+                })
+    except Exception as e:
+        #  페이지별 에러 무시하고 계속 진행
+        results.append({
+            "page_content": f"[Page {page_idx} skipped due to error: {str(e)}]",
+            "metadata": {**base_meta, "type": "error"}
+        })
     return results
 
 
+# ——— 파싱 결과 디스크 캐시 ———
+# 파싱 로직이나 결과 형식이 바뀌면 올려서 기존 캐시를 무효화
+PARSER_VERSION = "1"
+OCR_LANG = "eng+kor"
+_parse_cache = None
+_library_versions = None
+
+
+def get_library_versions() -> dict:
+    """파싱 결과에 영향을 주는 라이브러리 / tesseract 바이너리 버전 (프로세스당 한 번 조회)"""
+    global _library_versions
+    if _library_versions is None:
+        versions = {}
+        for name in ("docling", "pdfplumber", "pymupdf", "pytesseract"):
+            try:
+                versions[name] = importlib.metadata.version(name)
+            except importlib.metadata.PackageNotFoundError:
+                versions[name] = None
+        try:
+            import pytesseract
+
+            versions["tesseract"] = str(pytesseract.get_tesseract_version())
+        except Exception:
+            versions["tesseract"] = None
+        _library_versions = versions
+    return _library_versions
+
+
+def get_parse_cache() -> ParseCache:
+    global _parse_cache
+    if _parse_cache is None:
+        _parse_cache = ParseCache()
+    return _parse_cache
+
+
+def _iter_cached(method: str, pdf_path: str, iter_docs, use_cache: bool):
+    """
+    PDF 내용 해시 + PARSER_VERSION + 옵션(라이브러리 버전, Docling 파이프라인 옵션 포함)이 같으면 저장된 결과를 한 줄씩 읽어서, 없으면 iter_docs() 결과를
+    흘려보내면서 문서 단위로 캐시 임시 파일에 바로 쓴다 (결과 전체를 메모리에 모으지 않음).
+    끝까지 소비되었을 때만 항목으로 확정하고, 중간에 멈추거나 에러 페이지가 나오면 버린다.
+    """
+    cache = get_parse_cache()
+    if not use_cache or not cache.enabled:
+        yield from iter_docs()
+        return
+
+    options = {
+        "method": method,
+        "ocr_lang": OCR_LANG,
+        "libraries": get_library_versions(),
+        "docling_pipeline": DOCLING_PIPELINE_OPTIONS.model_dump(mode="json"),
+    }
+    key = cache.key(pdf_path, PARSER_VERSION, options)
+    cached = cache.iter_docs(key)
+    if cached is not None:
+        yield from cached
+        return
+
+    writer = cache.writer(key)
+    try:
+        for doc in iter_docs():
+            if writer is not None:
+                # 페이지 단위 에러가 섞인 결과는 일시적인 실패일 수 있으므로 저장하지 않음
+                if doc["metadata"].get("type") == "error":
+                    writer.abort()
+                    writer = None
+                else:
+                    writer.write(doc)
+            yield doc
+        if writer is not None:
+            writer.commit()
+    finally:
+        if writer is not None:
+            writer.abort()
+
+
+def _iter_ocr_pages(pdf_path: str, session: PdfSession):
+    """이미지 PDF 를 한 페이지씩 래스터화 + OCR (전체 페이지 이미지를 한꺼번에 메모리에 올리지 않음)"""
+    from pdf2image import convert_from_path
+    import pytesseract
+
+    for pi in range(session.page_count):
+        for img in convert_from_path(pdf_path, first_page=pi + 1, last_page=pi + 1):
+            txt = pytesseract.image_to_string(img, lang=OCR_LANG)
+            yield {
+                "page_content": txt,
+                "metadata": {"source": os.path.basename(pdf_path), "page": pi, "type": "ocr"}
+            }
+
+
 # ——— 메인 파싱 함수 (Docling 기반) ———
-def parse_docling_with_fallback(pdf_path: str):
+def parse_docling_with_fallback(
+    pdf_path: str, session: PdfSession | None = None, use_cache: bool = True
+):
     """
     Docling을 메인 파서로 사용하되, fallback 및 보정 병합 로직 포함
     """
-    docs = []
-    
+    return list(_iter_cached(
+        "parse_docling_with_fallback",
+        pdf_path,
+        lambda: iter(_parse_docling_with_fallback(pdf_path, session)),
+        use_cache,
+    ))
+
+
+def _parse_docling_with_fallback(pdf_path: str, session: PdfSession | None):
+    with open_pdf_session(pdf_path, session) as s:
+        docs = []
 
-    if not has_text_layer(pdf_path):
-        from pdf2image import convert_from_path
-        import pytesseract
+        if not has_text_layer(pdf_path, s):
+            return list(_iter_ocr_pages(pdf_path, s))
 
-        images = convert_from_path(pdf_path)
-        for pi, img in enumerate(images):
-            txt = pytesseract.image_to_string(img, lang="eng+kor")
+        converted = parse_docling_only(pdf_path)
+
+        for sec in converted.sections:
             docs.append({
-                "page_content": txt,
-                "metadata": {"source": os.path.basename(pdf_path), "page": pi, "type": "ocr"}
+                "page_content": sec.text,
+                "metadata": {"source": os.path.basename(pdf_path), "type": "section", "title": sec.title if hasattr(sec, "title") else None}
             })
-        return docs
-    
-    converted = parse_docling_only(pdf_path)
-    doc_struct = converted.document
-
-    for sec in doc_struct.sections:
-        docs.append({
-            "page_content": sec.text,
-            "metadata": {"source": os.path.basename(pdf_path), "type": "section", "title": sec.title if hasattr(sec, "title") else None}
-        })
 
-    for tbl in doc_struct.tables:
-        docs.append({
-            "page_content": tbl.html or tbl.markdown or tbl.csv, 
-            "metadata": {"source": os.path.basename(pdf_path), "type": "table", "page": tbl.page_number}
-        })
+        for tbl in converted.tables:
+            docs.append({
+                "page_content": tbl.html or tbl.markdown or tbl.csv, 
+                "metadata": {"source": os.path.basename(pdf_path), "type": "table", "page": _page_of(tbl)}
+            })
 
-    if not docs:
-        t1 = extract_text_mupdf_clean_strict(pdf_path)
-        t2, tbls = extract_text_pdfplumber(pdf_path)
-        
-        merged = t1 if len(t1) > len(t2) else t2
-        docs.append({
-            "page_content": merged,
-            "metadata": {"source": os.path.basename(pdf_path), "type": "fallback"}
-        })
-        for tm in tbls:
+        if not docs:
+            t1 = extract_text_mupdf_clean_strict(pdf_path, s)
+            t2, tbls = extract_text_pdfplumber(pdf_path, s)
+
+            merged = t1 if len(t1) > len(t2) else t2
             docs.append({
-                "page_content": tm["content"],
-                "metadata": {"source": os.path.basename(pdf_path), "type": "table", "page": tm["page"]}
+                "page_content": merged,
+                "metadata": {"source": os.path.basename(pdf_path), "type": "fallback"}
             })
+            for tm in tbls:
+                docs.append({
+                    "page_content": tm["content"],
+                    "metadata": {"source": os.path.basename(pdf_path), "type": "table", "page": tm["page"]}
+                })
 
-    return docs
+        return docs
 
 
 # ——— 6️⃣ 전체 문서 파싱 컨트롤러 ———
-def parse_with_docling(pdf_path: str):
+def parse_with_docling(pdf_path: str, session: PdfSession | None = None, use_cache: bool = True):
     """
     PDF를 페이지별로 분석하여
     Docling / pdfplumber / layoutparser / OCR 을 자동 적용
+    (PDF 는 백엔드별로 한 번만 열어서 모든 단계가 PdfSession 을 공유,
+     같은 PDF 의 결과는 디스크 캐시에서 재사용)
     """
-    docs = []
-
-    if not has_text_layer(pdf_path):
-        # 전체가 이미지 PDF일 경우 OCR
-        from pdf2image import convert_from_path
-        import pytesseract
-        images = convert_from_path(pdf_path)
-        for pi, img in enumerate(images):
-            txt = pytesseract.image_to_string(img, lang="eng+kor")
-            docs.append({
-                "page_content": txt,
-                "metadata": {"source": os.path.basename(pdf_path), "page": pi, "type": "ocr"}
-            })
-        return docs
+    return list(iter_parse_with_docling(pdf_path, session, use_cache))
 
-    # ✅ 페이지 단위 파싱 실행
-    adaptive_docs = parse_page_adaptively(pdf_path)
-
-    # ✅ fallback 안전장치 (혹시 실패했을 때)
-    if not adaptive_docs:
-        t1 = extract_text_mupdf_clean_strict(pdf_path)
-        t2, tbls = extract_text_pdfplumber(pdf_path)
-        merged = t1 if len(t1) > len(t2) else t2
-        docs.append({
-            "page_content": merged,
-            "metadata": {"source": os.path.basename(pdf_path), "type": "fallback"}
-        })
-        for tm in tbls:
-            docs.append({
-                "page_content": tm["content"],
-                "metadata": {"source": os.path.basename(pdf_path), "type": "table", "page": tm["page"]}
-            })
-    else:
-        docs.extend(adaptive_docs)
 
-    return docs
\ No newline at end of file
+def iter_parse_with_docling(
+    pdf_path: str, session: PdfSession | None = None, use_cache: bool = True
+):
+    """
+    parse_with_docling 의 generator 버전. 페이지 파싱이 끝나는 대로 문서(dict)를 내보내므로
+    청킹 / 임베딩을 파싱과 겹쳐서 돌릴 수 있다 (labs.chunkers.iter_chunks 참고).
+    """
+    return _iter_cached(
+        "parse_with_docling", pdf_path, lambda: _iter_parse_with_docling(pdf_path, session), use_cache
+    )
+
+
+def _iter_parse_with_docling(pdf_path: str, session: PdfSession | None):
+    with open_pdf_session(pdf_path, session) as s:
+        if not has_text_layer(pdf_path, s):
+            # 전체가 이미지 PDF일 경우 OCR
+            yield from _iter_ocr_pages(pdf_path, s)
+            return
+
+        # ✅ 페이지 단위 파싱 실행
+        produced = False
+        for doc in iter_page_adaptively(pdf_path, s):
+            produced = True
+            yield doc
+
+        # ✅ fallback 안전장치 (혹시 실패했을 때)
+        if not produced:
+            t1 = extract_text_mupdf_clean_strict(pdf_path, s)
+            t2, tbls = extract_text_pdfplumber(pdf_path, s)
+            merged = t1 if len(t1) > len(t2) else t2
+            yield {
+                "page_content": merged,
+                "metadata": {"source": os.path.basename(pdf_path), "type": "fallback"}
+            }
+            for tm in tbls:
+                yield {
+                    "page_content": tm["content"],
+                    "metadata": {"source": os.path.basename(pdf_path), "type": "table", "page": tm["page"]}
+                }
@@ -0,0 +1,206 @@
+"""
+PDF 파싱 결과 디스크 캐시 (content-addressed).
+
+키 = sha256(PDF 내용) + 파서 코드 버전 + 파싱 옵션 → 같은 PDF 를 같은 파서로 다시 돌리면
+Docling / pdfplumber / OCR 을 건너뛰고 저장된 결과를 읽는다.
+항목은 문서 한 줄씩의 gzip 압축 JSONL 파일 하나씩이라 쓰기 / 읽기 모두 문서 단위로 흘려보낼 수 있고,
+전체 크기가 max_bytes 를 넘으면 가장 오래 안 쓰인 것부터 삭제.
+
+환경 변수:
+    AXRIV_PARSE_CACHE_DIR  캐시 위치 (기본: <project root>/.parse_cache)
+    AXRIV_PARSE_CACHE_MB   최대 크기 MB (기본 2048, 0 이면 캐시 사용 안 함)
+"""
+import os
+import gzip
+import json
+import hashlib
+import time
+import threading
+from typing import Iterator, List, Optional
+
+from utils.helper import get_project_root
+
+
+def file_sha256(path: str, chunk_size: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class CacheWriter:
+    """캐시 항목 하나를 문서 단위로 써 나가는 임시 파일. commit() 해야 항목으로 보인다"""
+
+    def __init__(self, cache: "ParseCache", key: str):
+        self.cache = cache
+        self.path = cache._path(key)
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        # 다른 프로세스(배치 파싱 워커) / 스레드와 같은 키를 동시에 써도 깨지지 않도록 임시 파일 후 교체
+        self.tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        self._file = gzip.open(self.tmp_path, "wt", encoding="utf-8", compresslevel=6)
+
+    def write(self, doc: dict):
+        self._file.write(json.dumps(doc, ensure_ascii=False) + "\n")
+
+    def commit(self):
+        self._file.close()
+        self.cache._commit(self.tmp_path, self.path)
+
+    def abort(self):
+        if not self._file.closed:
+            self._file.close()
+            try:
+                os.remove(self.tmp_path)
+            except OSError:
+                pass
+
+
+class ParseCache:
+    SUFFIX = ".jsonl.gz"
+    # 이전 형식(JSON 배열) 항목: 읽지는 않고 LRU 삭제 대상으로만 센다
+    LEGACY_SUFFIXES = (".json.gz",)
+    # 죽은 워커가 남긴 임시 파일은 이 시간이 지나면 정리
+    STALE_TMP_SECONDS = 3600
+
+    def __init__(self, cache_dir: str | None = None, max_bytes: int | None = None):
+        self.cache_dir = cache_dir or os.environ.get(
+            "AXRIV_PARSE_CACHE_DIR", str(get_project_root() / ".parse_cache")
+        )
+        if max_bytes is None:
+            max_bytes = int(float(os.environ.get("AXRIV_PARSE_CACHE_MB", "2048")) * 1024 * 1024)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # (경로, 수정 시각, 크기) -> 내용 해시 (같은 프로세스에서 큰 PDF 를 다시 해싱하지 않도록)
+        self._hashes = {}
+        self._total_bytes = None
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def key(self, pdf_path: str, parser_version: str, options: dict) -> str:
+        stat = os.stat(pdf_path)
+        file_key = (os.path.abspath(pdf_path), stat.st_mtime_ns, stat.st_size)
+        digest = self._hashes.get(file_key)
+        if digest is None:
+            digest = self._hashes[file_key] = file_sha256(pdf_path)
+        payload = json.dumps(
+            {"file": digest, "parser": parser_version, "options": options}, sort_keys=True
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], key + self.SUFFIX)
+
+    def iter_docs(self, key: str) -> Optional[Iterator[dict]]:
+        """저장된 문서를 한 줄씩 읽는 iterator (없으면 None)"""
+        path = self._path(key)
+        try:
+            f = gzip.open(path, "rt", encoding="utf-8")
+            first = f.readline()
+            # 읽을 때마다 수정 시각을 갱신 → 삭제 순서가 LRU 가 됨
+            os.utime(path)
+        except (OSError, EOFError):
+            self.misses += 1
+            return None
+        self.hits += 1
+
+        def lines():
+            with f:
+                if first:
+                    yield json.loads(first)
+                for line in f:
+                    yield json.loads(line)
+
+        return lines()
+
+    def get(self, key: str) -> Optional[List[dict]]:
+        docs = self.iter_docs(key)
+        return list(docs) if docs is not None else None
+
+    def writer(self, key: str) -> CacheWriter:
+        return CacheWriter(self, key)
+
+    def put(self, key: str, docs: List[dict]):
+        writer = self.writer(key)
+        try:
+            for doc in docs:
+                writer.write(doc)
+            writer.commit()
+        finally:
+            writer.abort()
+
+    def _commit(self, tmp_path: str, path: str):
+        size = os.path.getsize(tmp_path)
+        # 같은 키를 다시 쓰면 기존 파일 크기는 빼고 더함
+        try:
+            old_size = os.path.getsize(path)
+        except OSError:
+            old_size = 0
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            if self._total_bytes is None:
+                self._total_bytes = self._scan()[1]
+            else:
+                self._total_bytes += size - old_size
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def _scan(self, remove_stale_tmp: bool = False):
+        entries = []
+        total = 0
+        now = time.time()
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                path = os.path.join(root, name)
+                if name.endswith(".tmp"):
+                    # 시간 제한으로 종료된 워커 등이 남긴 쓰다 만 항목
+                    if remove_stale_tmp:
+                        try:
+                            if now - os.stat(path).st_mtime > self.STALE_TMP_SECONDS:
+                                os.remove(path)
+                        except OSError:
+                            pass
+                    continue
+                if not name.endswith((self.SUFFIX, *self.LEGACY_SUFFIXES)):
+                    continue
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+        return entries, total
+
+    def _evict(self):
+        # 여러 프로세스가 같은 디렉터리를 쓰므로 실제 파일 기준으로 다시 계산
+        entries, total = self._scan(remove_stale_tmp=True)
+        entries.sort()
+        # 한 번 정리할 때 여유를 두고(90%) 지워서 매 put 마다 디렉터리를 훑지 않게 함
+        target = self.max_bytes * 0.9
+        for _, size, path in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            self.evictions += 1
+        self._total_bytes = total
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "dir": self.cache_dir,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "evictions": self.evictions,
+        }
@@ -0,0 +1,284 @@
+"""
+AxrivRetriever 오프라인 벤치마크.
+
+- Q1:/A1: 형식의 합성 QA 코퍼스를 원하는 크기로 생성 (질의별 정답 문서를 심어 둠)
+- 모델 다운로드 없이 결정적인 해싱 임베딩을 사용
+- 인덱스 빌드 시간 / 메모리, dense / bm25 / hybrid 검색의 p50/p95/p99 지연과 recall@k 를 JSON 으로 출력
+- 검색 방식별로 벡터 저장소 통계(문서당 인덱스 크기, 벡터 검색 평균 지연 등)도 함께 기록
+
+사용 예시 (src 디렉터리에서):
+    python -m labs.retrieval_benchmark --pairs 10000 --queries 500 --output bench.json
+    python -m labs.retrieval_benchmark --pairs 100000 --backend faiss --faiss-index-type hnsw
+"""
+import os
+import gc
+import sys
+import json
+import time
+import random
+import shutil
+import hashlib
+import argparse
+import platform
+import resource
+import tempfile
+from typing import List
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from core.rag.AxrivRetriever import AxrivRetriever
+from core.rag.BM25Index import ko_en_tokenize
+
+
+class HashingEmbeddings(Embeddings):
+    """토큰 해싱 기반 결정적 임베딩 (bag-of-words, 정규화). 실제 모델 대신 쓰는 대역"""
+
+    def __init__(self, dim: int = 384):
+        self.dim = dim
+
+    def _embed(self, text: str) -> List[float]:
+        vec = np.zeros(self.dim, dtype=np.float32)
+        for token in ko_en_tokenize(text):
+            digest = hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest()
+            h = int.from_bytes(digest, "little")
+            vec[h % self.dim] += 1.0 if (h >> 32) & 1 else -1.0
+        norm = np.linalg.norm(vec)
+        return (vec / norm if norm else vec).tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self._embed(t) for t in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed(text)
+
+
+# ——— 합성 코퍼스 ———
+_LATIN = "abcdefghijklmnoprstuvwyz"
+_HANGUL_SYLLABLES = "가나다라마바사아자차카타파하거너더러머버서어저처커터퍼허고노도로모보소오조초"
+
+
+def _make_vocab(rng: random.Random, size: int) -> List[str]:
+    words = set()
+    while len(words) < size:
+        if rng.random() < 0.2:
+            words.add("".join(rng.choice(_HANGUL_SYLLABLES) for _ in range(rng.randint(2, 4))))
+        else:
+            words.add("".join(rng.choice(_LATIN) for _ in range(rng.randint(4, 9))))
+    return sorted(words)
+
+
+def build_corpus(
+    base_dir: str,
+    n_pairs: int,
+    n_queries: int,
+    pairs_per_paper: int = 50,
+    pairs_per_line: int = 5,
+    vocab_size: int = 20000,
+    seed: int = 0,
+) -> List[dict]:
+    """
+    base_dir 아래에 <paper>_pages/qa_dataset.jsonl 들을 만들고,
+    정답 문서 ID 가 붙은 평가 질의 목록을 돌려준다.
+    질의는 질문 단어 일부 + 답변 단어 하나 + 잡음 단어로 만든 paraphrase.
+    """
+    rng = random.Random(seed)
+    vocab = _make_vocab(rng, vocab_size)
+    planted = set(rng.sample(range(n_pairs), min(n_queries, n_pairs)))
+    queries = []
+
+    pair_idx = 0
+    paper_idx = 0
+    while pair_idx < n_pairs:
+        folder = os.path.join(base_dir, f"bench_{paper_idx:06d}_pages")
+        os.makedirs(folder, exist_ok=True)
+        with open(os.path.join(folder, "qa_dataset.jsonl"), "w", encoding="utf-8") as f:
+            in_paper = 0
+            while in_paper < pairs_per_paper and pair_idx < n_pairs:
+                lines = []
+                for i in range(1, pairs_per_line + 1):
+                    if in_paper >= pairs_per_paper or pair_idx >= n_pairs:
+                        break
+                    q_words = rng.sample(vocab, 6)
+                    a_words = rng.sample(vocab, 20)
+                    q = f"What does {' '.join(q_words)} mean?"
+                    a = " ".join(a_words) + "."
+                    lines.append(f"Q{i}: {q}\nA{i}: {a}")
+
+                    if pair_idx in planted:
+                        query_words = rng.sample(q_words, 3)
+                        query_words += [rng.choice(a_words), rng.choice(vocab)]
+                        rng.shuffle(query_words)
+                        # 문서 ID 는 AxrivRetriever._create_documents 와 같은 내용 해시
+                        doc_id = AxrivRetriever._content_hash(f"Question: {q}\nAnswer: {a}")
+                        queries.append({"query": " ".join(query_words), "doc_id": doc_id})
+                    pair_idx += 1
+                    in_paper += 1
+                f.write(json.dumps({"qa_pair": "\n".join(lines)}, ensure_ascii=False) + "\n")
+        paper_idx += 1
+
+    rng.shuffle(queries)
+    return queries
+
+
+# ——— 측정 ———
+def _max_rss_mb() -> float:
+    # 리눅스는 KB, macOS 는 byte 단위
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def _dir_size_mb(path: str) -> float:
+    total = 0
+    for root, _, files in os.walk(path):
+        total += sum(os.path.getsize(os.path.join(root, f)) for f in files)
+    return total / (1024 * 1024)
+
+
+def _measure(search_fn, queries: List[dict], k: int, warmup: int = 5) -> dict:
+    for q in queries[:warmup]:
+        search_fn(q["query"])
+
+    latencies = []
+    hits = 0
+    for q in queries:
+        start = time.perf_counter()
+        docs = search_fn(q["query"])
+        latencies.append((time.perf_counter() - start) * 1000)
+        hits += any(d.id == q["doc_id"] for d in docs[:k])
+
+    lat = np.asarray(latencies)
+    return {
+        "p50_ms": round(float(np.percentile(lat, 50)), 3),
+        "p95_ms": round(float(np.percentile(lat, 95)), 3),
+        "p99_ms": round(float(np.percentile(lat, 99)), 3),
+        "mean_ms": round(float(lat.mean()), 3),
+        "qps": round(float(len(lat) / (lat.sum() / 1000)), 1) if lat.sum() else 0.0,
+        f"recall@{k}": round(hits / len(queries), 4) if queries else 0.0,
+    }
+
+
+def run_benchmark(args) -> dict:
+    work_dir = args.work_dir or tempfile.mkdtemp(prefix="axriv_bench_")
+    data_dir = os.path.join(work_dir, "data", "bench")
+    store_dir = os.path.join(work_dir, "store")
+    os.makedirs(data_dir, exist_ok=True)
+
+    try:
+        start = time.perf_counter()
+        queries = build_corpus(
+            data_dir, args.pairs, args.queries, args.pairs_per_paper, seed=args.seed
+        )
+        corpus_seconds = time.perf_counter() - start
+        print(f"합성 코퍼스 생성: {args.pairs} pairs, {len(queries)} queries ({corpus_seconds:.1f}s)")
+
+        faiss_kwargs = {}
+        if args.quantization:
+            faiss_kwargs["quantization"] = args.quantization
+        if args.truncate_dim:
+            faiss_kwargs["truncate_dim"] = args.truncate_dim
+        if args.rescore_factor:
+            faiss_kwargs["rescore_factor"] = args.rescore_factor
+
+        gc.collect()
+        rss_before = _max_rss_mb()
+        start = time.perf_counter()
+        retriever = AxrivRetriever(
+            base_dir=data_dir,
+            persist_dir=store_dir,
+            vector_backend=args.backend,
+            faiss_index_type=args.faiss_index_type,
+            faiss_kwargs=faiss_kwargs,
+            embed_batch_size=args.batch_size,
+            load_workers=args.load_workers,
+            dedupe_threshold=args.dedupe_threshold,
+            # 같은 질의 반복 측정 시 캐시 효과가 섞이지 않도록 질의 임베딩 캐시는 끔
+            query_cache_bytes=0,
+            embedding=HashingEmbeddings(dim=args.dim),
+        )
+        build_seconds = time.perf_counter() - start
+
+        k = args.k
+        methods = {
+            "dense_search": lambda q: retriever.dense_search({"k": k}, q),
+            "bm25_search": lambda q: retriever.bm25_search(k, q),
+            "hybrid_search": lambda q: retriever.hybrid_search(q, k=k),
+            "hybrid_search_rrf": lambda q: retriever.hybrid_search(q, k=k, fusion="rrf"),
+        }
+        results = {}
+        for name, fn in methods.items():
+            retriever.vector_store.reset_stats()
+            results[name] = _measure(fn, queries, k)
+            # 질의 루프가 끝난 뒤에 읽어야 avg_search_ms 에 이번 방식의 검색이 반영됨
+            results[name]["vector_store"] = retriever.vector_store.stats()
+            print(name, results[name])
+
+        return {
+            "config": {
+                "pairs": args.pairs,
+                "queries": len(queries),
+                "k": k,
+                "backend": args.backend,
+                "faiss_index_type": args.faiss_index_type if args.backend == "faiss" else None,
+                "quantization": args.quantization,
+                "truncate_dim": args.truncate_dim,
+                "rescore_factor": args.rescore_factor,
+                "dim": args.dim,
+                "dedupe_threshold": args.dedupe_threshold,
+                "load_workers": args.load_workers,
+                "seed": args.seed,
+            },
+            "environment": {
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "cpu_count": os.cpu_count(),
+            },
+            "build": {
+                "docs": len(retriever.docs),
+                "seconds": round(build_seconds, 3),
+                "docs_per_sec": round(len(retriever.docs) / max(build_seconds, 1e-9), 1),
+                "docstore_mb": round(retriever.docs.nbytes() / (1024 * 1024), 1),
+                "max_rss_mb": round(_max_rss_mb(), 1),
+                "rss_growth_mb": round(_max_rss_mb() - rss_before, 1),
+                "disk_mb": round(_dir_size_mb(work_dir) - _dir_size_mb(data_dir), 1),
+            },
+            "search": results,
+        }
+    finally:
+        if not args.keep and not args.work_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AxrivRetriever 오프라인 벤치마크")
+    parser.add_argument("--pairs", type=int, default=10000, help="합성 QA 쌍 수 (10k ~ 1M)")
+    parser.add_argument("--queries", type=int, default=500, help="정답이 심어진 평가 질의 수")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--backend", choices=["chroma", "faiss"], default="chroma")
+    parser.add_argument("--faiss-index-type", choices=["flat", "hnsw", "ivf"], default="flat")
+    parser.add_argument("--quantization", choices=["int8", "binary"], default=None)
+    parser.add_argument("--truncate-dim", type=int, default=None, help="1차 검색용으로 앞 N 차원만 사용 (faiss)")
+    parser.add_argument("--rescore-factor", type=int, default=None, help="재채점 후보 배수 (faiss, 기본 4)")
+    parser.add_argument("--dim", type=int, default=384, help="해싱 임베딩 차원")
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--load-workers", type=int, default=1, help="QA 파싱 워커 프로세스 수")
+    parser.add_argument("--pairs-per-paper", type=int, default=50)
+    parser.add_argument("--dedupe-threshold", type=float, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--work-dir", default=None, help="코퍼스/인덱스 위치 (지정하면 삭제하지 않음)")
+    parser.add_argument("--keep", action="store_true", help="임시 작업 디렉터리를 남김")
+    parser.add_argument("--output", default=None, help="결과 JSON 경로 (없으면 stdout)")
+    args = parser.parse_args()
+
+    report = run_benchmark(args)
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+        print("결과 저장:", args.output)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,22 +1,156 @@
+import os
+import time
+import threading
+from typing import Optional
+
 from langchain_core.tools import tool
-from core.rag.AxrivRetriever import AxrivRetriever
+from core.rag.RetrievalClient import RetrievalClient
+from core.rag.SemanticResultCache import SemanticResultCache
+from core.rag.ContextPacker import ContextPacker
+
+# 임포트 시점에는 모델/인덱스를 로드하지 않고, 처음 필요할 때(또는 워밍업 스레드에서) 생성
+_axriv_retriever = None
+_retriever_lock = threading.Lock()
+_retriever_ready = threading.Event()
+_warmup_error = None
+_warmup_failed_at = None
+_warmup_thread = None
+_warmup_lock = threading.Lock()
+# 워밍업이 실패했으면 상태 조회(/health) 시 이 간격마다 다시 시도
+WARMUP_RETRY_SECONDS = float(os.environ.get("AXRIV_WARMUP_RETRY_SECONDS", "30"))
+
+# 표현만 다른 같은 질문은 이전 검색 결과를 재사용 (임베딩 유사도 기준)
+_result_cache = SemanticResultCache(
+    threshold=float(os.environ.get("AXRIV_RESULT_CACHE_THRESHOLD", "0.95")),
+    ttl_seconds=float(os.environ.get("AXRIV_RESULT_CACHE_TTL", "3600")),
+    max_entries=int(os.environ.get("AXRIV_RESULT_CACHE_SIZE", "1024")),
+)
+
+# 도구 결과는 이후 모든 llm_call 에 다시 실리므로 토큰 예산 안에서만 반환
+_context_packer = ContextPacker(
+    max_tokens=int(os.environ.get("AXRIV_CONTEXT_TOKENS", "2000")),
+    max_sentences=int(os.environ.get("AXRIV_CONTEXT_SENTENCES", "3")),
+)
+
+
+def get_axriv_retriever():
+    """
+    AXRIV_RETRIEVER_URL 이 있으면 별도 검색 서버(RetrievalServer)의 클라이언트를,
+    없으면 이 프로세스 안에 ShardedRetriever 를 올려서 반환
+    """
+    global _axriv_retriever
+    if _axriv_retriever is None:
+        with _retriever_lock:
+            if _axriv_retriever is None:
+                url = os.environ.get("AXRIV_RETRIEVER_URL")
+                if url:
+                    _axriv_retriever = RetrievalClient(url)
+                else:
+                    from core.rag.ShardedRetriever import ShardedRetriever
+
+                    # src/data 아래 도메인(agent, rag ...)별 샤드
+                    _axriv_retriever = ShardedRetriever()
+    return _axriv_retriever
+
+
+def _mark_ready():
+    global _warmup_error
+    _warmup_error = None
+    _retriever_ready.set()
+
+
+def _warm_up():
+    global _warmup_error, _warmup_failed_at
+    try:
+        retriever = get_axriv_retriever()
+        if isinstance(retriever, RetrievalClient):
+            # 원격 모드: 서버의 로드/워밍업이 끝날 때까지 대기
+            retriever.wait_until_ready()
+        # 합성 질의로 모델 / 인덱스 / 스레드 풀을 한 번 태워서 첫 실제 요청의 콜드 비용 제거
+        from core.rag.AxrivRetriever import AxrivRetriever
+
+        retriever.hybrid_search(AxrivRetriever.warmup_query)
+        _context_packer.warm_up()
+        _mark_ready()
+        print("Retriever 워밍업 완료")
+    except Exception as e:
+        _warmup_error = e
+        _warmup_failed_at = time.monotonic()
+        print("Retriever 워밍업 실패", e)
+
+
+def start_retriever_warmup() -> threading.Thread:
+    """서비스 시작 시 호출: 백그라운드 스레드에서 retriever 로드 + 워밍업 (이미 진행 중이면 그 스레드 반환)"""
+    global _warmup_thread
+    with _warmup_lock:
+        if _warmup_thread is None or not _warmup_thread.is_alive():
+            _warmup_thread = threading.Thread(target=_warm_up, name="axriv-retriever-warmup", daemon=True)
+            _warmup_thread.start()
+        return _warmup_thread
+
+
+def retriever_status() -> dict:
+    # 일시적인 실패(원격 서버 재시작 등)로 ready 가 영영 False 로 남지 않도록 주기적으로 재시도
+    if (
+        not _retriever_ready.is_set()
+        and _warmup_error is not None
+        and time.monotonic() - _warmup_failed_at >= WARMUP_RETRY_SECONDS
+    ):
+        start_retriever_warmup()
+    return {
+        "ready": _retriever_ready.is_set(),
+        "loaded": _axriv_retriever is not None,
+        "error": str(_warmup_error) if _warmup_error else None,
+        "result_cache": _result_cache.stats(),
+        "context_packing": _context_packer.stats(),
+    }
+
+
+def cached_hybrid_search(query: str, filters: dict | None = None):
+    """의미상 같은 질의의 결과가 캐시에 있으면 재사용, 없으면 검색 후 저장"""
+    retriever = get_axriv_retriever()
+    if isinstance(retriever, RetrievalClient):
+        # 원격 모드에서는 서버가 결과 캐시를 갖고 있음 (여기서 임베딩하려면 모델이 필요)
+        results = retriever.hybrid_search(query, filters=filters)
+        _mark_ready()
+        return results
+    # 질의 임베딩은 retriever 의 캐시에 남으므로 캐시 미스 시 검색에서 다시 계산하지 않음
+    vector = retriever.query_cache.get_or_compute(query, retriever.embedding.embed_query)
+    scope = tuple(sorted((filters or {}).items()))
+    version = retriever.index_version
+
+    results = _result_cache.get(vector, scope, version)
+    if results is None:
+        start = time.perf_counter()
+        results = retriever.hybrid_search(query, filters=filters)
+        latency_ms = (time.perf_counter() - start) * 1000
+        _result_cache.put(vector, scope, results, version, latency_ms)
+    # 워밍업이 실패했더라도 실제 검색이 성공했으면 준비된 것으로 본다
+    _mark_ready()
+    return results
 
-axriv_retriever = AxrivRetriever()
 
 @tool(parse_docstring=True)
-def axriv_search(query: str) -> str:
+def axriv_search(query: str, domain: Optional[str] = None) -> str:
     """
     2024년 10월 ~ 2025년 최신 AI 에이전트 관련 문서를 검색하는 도구입니다.
     이 도구는 LLM의 지식 커트 이외에 최신 정보들을 제공합니다.    
 
     Args:
         query: 검색 질의
+        domain: 검색할 분야 ("agent" 또는 "rag"). 지정하지 않으면 전체 분야에서 검색
 
     Returns:
         검색된 문서들의 텍스트
     """
-    results = axriv_retriever.hybrid_search(query)
+    filters = {"domain": domain} if domain else None
+    results = cached_hybrid_search(query, filters)
 
-    # Document 객체에서 page_content만 꺼내서 LLM에게 반환
-    merged_text = "\n\n---\n\n".join([r.page_content for r in results])
-    return merged_text
\ No newline at end of file
+    # 중복 답변 제거 + 질의 관련 문장만 남겨서 토큰 예산 안에서 LLM에게 반환
+    packed_text, stats = _context_packer.pack(query, results)
+    print(
+        f"axriv_search 컨텍스트: {stats['raw_tokens']} -> {stats['packed_tokens']} tokens "
+        f"(절약 {stats['saved_tokens']}, 문서 {stats['packed_docs']}/{stats['docs']}, "
+        f"중복 제외 {stats['redundant_docs']})"
+    )
+    return packed_text
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# src 아래 모듈(core.*, labs.*, utils.*)을 절대 경로로 import 할 수 있도록
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
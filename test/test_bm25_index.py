@@ -0,0 +1,57 @@
+"""BM25Index 점수가 rank_bm25.BM25Okapi 와 같은지 랜덤 코퍼스로 확인"""
+import numpy as np
+import pytest
+
+from core.rag.BM25Index import BM25Index
+
+rank_bm25 = pytest.importorskip("rank_bm25")
+
+
+def _random_corpus(n_docs: int, vocab_size: int = 500, seed: int = 0):
+    rng = np.random.RandomState(seed)
+    vocab = [f"w{i}" for i in range(vocab_size)]
+    # 지프 분포 비슷하게: 자주 나오는 단어(음수 IDF → epsilon 보정)와 드문 단어가 섞이도록
+    probs = 1.0 / np.arange(1, vocab_size + 1)
+    probs /= probs.sum()
+    docs = [
+        " ".join(rng.choice(vocab, size=rng.randint(5, 60), p=probs)) for _ in range(n_docs)
+    ]
+    queries = [" ".join(rng.choice(vocab, size=rng.randint(1, 6))) for _ in range(50)]
+    return docs, queries
+
+
+@pytest.fixture(scope="module")
+def corpus():
+    docs, queries = _random_corpus(2000)
+    index = BM25Index.build([str(i) for i in range(len(docs))], docs, tokenizer="whitespace")
+    reference = rank_bm25.BM25Okapi([d.split() for d in docs])
+    return index, reference, queries
+
+
+def test_scores_match_rank_bm25(corpus):
+    index, reference, queries = corpus
+    ours = index.get_scores_many(queries)
+    for qi, query in enumerate(queries):
+        expected = reference.get_scores(query.split())
+        np.testing.assert_allclose(ours[qi], expected, rtol=1e-5, atol=1e-5)
+
+
+def test_top_k_matches_rank_bm25(corpus):
+    index, reference, queries = corpus
+    k = 3
+    for query, hits in zip(queries, index.search_rows_many(queries, k)):
+        expected = reference.get_scores(query.split())
+        top = np.sort(expected)[::-1][:k]
+        top = top[top > 0]
+        np.testing.assert_allclose([s for _, s in hits][: len(top)], top, rtol=1e-5, atol=1e-5)
+        # 동점이 아닌 문서는 같은 문서여야 함
+        for row, score in hits[: len(top)]:
+            assert abs(expected[row] - score) <= 1e-5 * max(1.0, abs(score))
+
+
+def test_save_load_keeps_scores(corpus, tmp_path):
+    index, _, queries = corpus
+    path = str(tmp_path / "bm25.pkl")
+    index.save(path)
+    loaded = BM25Index.load(path)
+    np.testing.assert_array_equal(loaded.get_scores_many(queries), index.get_scores_many(queries))
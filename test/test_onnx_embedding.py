@@ -0,0 +1,84 @@
+"""작은 임의 BERT 로 ONNX export → parity 확인 (모델 다운로드 없음)"""
+import json
+
+import numpy as np
+import pytest
+
+from core.rag import EmbeddingBackend as eb
+
+
+def _make_tiny_model(path, max_position_embeddings=128):
+    from tokenizers import Tokenizer, models, pre_tokenizers, processors
+    from transformers import BertConfig, BertModel, PreTrainedTokenizerFast
+
+    specials = ["[PAD]", "[UNK]", "[CLS]", "[SEP]"]
+    words = sorted({w for text in eb.PARITY_TEXTS for w in text.split()})
+    vocab = {token: i for i, token in enumerate(specials + words)}
+    tok = Tokenizer(models.WordLevel(vocab=vocab, unk_token="[UNK]"))
+    tok.pre_tokenizer = pre_tokenizers.WhitespaceSplit()
+    tok.post_processor = processors.TemplateProcessing(
+        single="[CLS] $A [SEP]",
+        special_tokens=[("[CLS]", vocab["[CLS]"]), ("[SEP]", vocab["[SEP]"])],
+    )
+    PreTrainedTokenizerFast(
+        tokenizer_object=tok,
+        unk_token="[UNK]",
+        pad_token="[PAD]",
+        cls_token="[CLS]",
+        sep_token="[SEP]",
+    ).save_pretrained(path)
+
+    config = BertConfig(
+        vocab_size=len(vocab),
+        hidden_size=32,
+        num_hidden_layers=2,
+        num_attention_heads=2,
+        intermediate_size=64,
+        max_position_embeddings=max_position_embeddings,
+    )
+    BertModel(config).save_pretrained(path)
+    return str(path)
+
+
+@pytest.fixture(scope="module")
+def tiny_model(tmp_path_factory):
+    return _make_tiny_model(tmp_path_factory.mktemp("tiny_model"))
+
+
+@pytest.fixture(scope="module")
+def tiny_onnx(tiny_model, tmp_path_factory):
+    output_dir = str(tmp_path_factory.mktemp("tiny_onnx"))
+    eb.export_onnx(tiny_model, output_dir)
+    return output_dir
+
+
+def test_plain_hf_model_uses_sentence_transformers_defaults(tiny_model):
+    # sentence-transformers 설정이 없으면 mean pooling + position embedding 크기
+    assert eb.sentence_transformer_config(tiny_model) == {"pooling": "mean", "max_length": 128}
+
+
+def test_max_seq_length_is_capped_by_position_embeddings(tmp_path):
+    model = _make_tiny_model(tmp_path)
+    (tmp_path / "1_Pooling").mkdir()
+    (tmp_path / "modules.json").write_text(json.dumps([
+        {"idx": 0, "name": "0", "path": "", "type": "sentence_transformers.models.Transformer"},
+        {"idx": 1, "name": "1", "path": "1_Pooling", "type": "sentence_transformers.models.Pooling"},
+    ]))
+    (tmp_path / "1_Pooling" / "config.json").write_text(json.dumps({"pooling_mode_cls_token": True}))
+    (tmp_path / "sentence_bert_config.json").write_text(json.dumps({"max_seq_length": 1024}))
+    assert eb.sentence_transformer_config(model) == {"pooling": "cls", "max_length": 128}
+
+
+def test_onnx_embeds_texts_longer_than_position_embeddings(tiny_onnx):
+    embedding = eb.OnnxEmbeddings(tiny_onnx, variant="fp32")
+    vectors = np.asarray(embedding.embed_documents(eb.PARITY_TEXTS))
+    assert vectors.shape == (len(eb.PARITY_TEXTS), 32)
+    np.testing.assert_allclose(np.linalg.norm(vectors, axis=1), 1.0, atol=1e-5)
+
+
+def test_parity_with_huggingface_embeddings(tiny_model, tiny_onnx):
+    pytest.importorskip("sentence_transformers")
+    report = eb.parity_check(tiny_model, tiny_onnx)
+    assert report["texts"] == len(eb.PARITY_TEXTS)
+    assert report["fp32"]["min_cosine"] >= 0.9999
+    assert report["int8"]["min_cosine"] >= 0.95